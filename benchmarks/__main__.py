@@ -0,0 +1,171 @@
+import argparse
+import base64
+import functools
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import readenv
+
+from .generate import make_tree, QUOTES, write_env
+
+Results = Dict[str, float]
+
+BASELINE: str = os.path.join(os.path.dirname(__file__), "baseline.json")
+# allowed slowdown of the noisier metrics, by name prefix, instead of --threshold
+THRESHOLDS: Dict[str, float] = {"discovery.cold.": 0.5, "import.": 0.5, "memory.": 0.1}
+
+
+def measure(func: Callable[[], Any], *, number: int = 1, repeat: int = 9) -> float:
+    """Best time per call, in seconds"""
+    timings: List[float] = []
+    for _ in range(repeat):
+        gc.collect()
+        start: float = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings)
+
+
+def load(path: str, cache: Optional[readenv.ParseCache] = None) -> None:
+    readenv.Environ(parse_cache=cache).load(path)
+
+
+def bench_load(tmpdir: str, results: Results) -> None:
+    for count in (1_000, 10_000):
+        for quotes in QUOTES:
+            path: str = write_env(os.path.join(tmpdir, f"{quotes}-{count}.env"), count, quotes=quotes)
+            results[f"load.{quotes}.{count}"] = measure(functools.partial(load, path))
+        for density in (0.1, 0.5):
+            path = write_env(os.path.join(tmpdir, f"expand-{density}-{count}.env"), count, density=density)
+            results[f"load.expand-{density}.{count}"] = measure(functools.partial(load, path))
+    path = os.path.join(tmpdir, "plain-10000.env")
+    cache: readenv.ParseCache = readenv.ParseCache()
+    load(path, cache)
+    results["load.cached.10000"] = measure(functools.partial(load, path, cache))
+
+
+def bench_discovery(tmpdir: str, results: Results) -> None:
+    for depth in (5, 20):
+        root: str = os.path.join(tmpdir, f"tree-{depth}")
+        os.mkdir(root)
+        start: str = make_tree(root, depth, filenames=(".env",))
+        find: Callable[[readenv.Discovery], Any] = functools.partial(
+            readenv.Discovery.find, filenames=[".env", ".env.local"], start=start
+        )
+        results[f"discovery.cold.{depth}"] = measure(lambda: find(readenv.Discovery()), number=10)  # noqa: B023
+        results[f"discovery.warm.{depth}"] = measure(functools.partial(find, readenv.Discovery()), number=100)
+
+
+def bench_get(results: Results) -> None:
+    values: Dict[str, str] = {
+        "INT": "42",
+        "BOOL": "yes",
+        "JSON": base64.b64encode(json.dumps({f"key{i}": i for i in range(100)}).encode()).decode(),
+        "LIST": ",".join(str(i) for i in range(1_000)),
+    }
+    for name, cache in (("get", None), ("get.cached", readenv.CastCache())):
+        env: readenv.Environ = readenv.Environ(dict(values), cast_cache=cache)
+        results[f"{name}.str"] = measure(functools.partial(env.str, "INT"), number=100_000, repeat=25)
+        results[f"{name}.int"] = measure(functools.partial(env.int, "INT"), number=100_000, repeat=25)
+        results[f"{name}.bool"] = measure(functools.partial(env.bool, "BOOL"), number=100_000, repeat=25)
+        results[f"{name}.json"] = measure(functools.partial(env.json, "JSON"), number=1_000)
+        results[f"{name}.list-int"] = measure(functools.partial(env.list, "LIST", cast=int), number=1_000)
+
+
+def import_time(module: str) -> float:
+    """Cumulative import time of module and its dependencies, as reported by -X importtime, in seconds"""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], check=True, capture_output=True, text=True
+    )
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields: List[str] = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1_000_000
+    raise RuntimeError(f"cannot find {module} in -X importtime output")
+
+
+def bench_import(results: Results) -> None:
+    for module in ("readenv", "readenv.loads"):
+        results[f"import.{module}"] = min(import_time(module) for _ in range(10))
+
+
+def bench_memory(tmpdir: str, results: Results) -> None:
+    path: str = os.path.join(tmpdir, "plain-10000.env")
+    tracemalloc.start()
+    readenv.Environ().load(path)
+    results["memory.load.10000"] = float(tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+
+def run() -> Results:
+    results: Results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bench_load(tmpdir, results)
+        bench_discovery(tmpdir, results)
+        bench_memory(tmpdir, results)
+    bench_get(results)
+    bench_import(results)
+    return results
+
+
+def compare(results: Results, baseline: Results, threshold: float, floor: float) -> List[str]:
+    regressions: List[str] = []
+    for name, value in sorted(results.items()):
+        base: Optional[float] = baseline.get(name)
+        ratio: float = value / base if base else 1.0
+        allowed: float = next((t for prefix, t in THRESHOLDS.items() if name.startswith(prefix)), threshold)
+        flag: str = ""
+        if ratio > 1 + allowed:
+            # timings below the floor are mostly timer and interpreter noise: reported, not gated
+            if not name.startswith("memory.") and max(value, base or 0) < floor:
+                flag = "  (below floor)"
+            else:
+                regressions.append(name)
+                flag = "  REGRESSION"
+        print(f"{name:32} {value:14.6g} {base or 0:14.6g} {ratio:8.2f}x{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="readenv benchmarks")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline json file [default=%(default)s]")
+    parser.add_argument("--threshold", type=float, default=0.3, help="allowed slowdown ratio [default=%(default)s]")
+    parser.add_argument(
+        "--floor", type=float, default=5e-6, help="timings below this are not gated, in seconds [default=%(default)s]"
+    )
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--output", help="also write the results to this json file")
+    args = parser.parse_args(argv)
+
+    results: Results = run()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        return 0
+    try:
+        with open(args.baseline) as f:
+            baseline: Results = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+    regressions: List[str] = compare(results, baseline, args.threshold, args.floor)
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import os
+import random
+import time
+from typing import List, Sequence
+
+QUOTES: Sequence[str] = ("plain", "single", "escaped", "multiline")
+
+
+def env_lines(count: int, *, quotes: str = "plain", density: float = 0.0, seed: int = 42) -> List[str]:
+    """Return count lines of KEY=VALUE, with the given quote style and ratio of ${VAR} references"""
+    rnd: random.Random = random.Random(seed)
+    lines: List[str] = []
+    for index in range(count):
+        value: str = f"value-{index}-{rnd.randrange(1_000_000)}"
+        if index and rnd.random() < density:
+            value = f"{value}-${{KEY_{rnd.randrange(index)}}}"
+        if quotes == "single":
+            value = f"'{value}'"
+        elif quotes == "escaped":
+            value = f"''{value}\\'s''"
+        elif quotes == "multiline" and index % 10 == 0:
+            value = f"'{value}\nsecond line\nthird line'"
+        lines.append(f"KEY_{index}={value}")
+    return lines
+
+
+def write_env(path: str, count: int, *, quotes: str = "plain", density: float = 0.0) -> str:
+    with open(path, "w") as f:
+        f.write("\n".join(env_lines(count, quotes=quotes, density=density)))
+        f.write("\n")
+    return path
+
+
+def make_tree(root: str, depth: int, *, filenames: Sequence[str] = (".env",)) -> str:
+    """Create depth nested directories under root, with filenames at the top, and return the deepest one"""
+    for filename in filenames:
+        write_env(os.path.join(root, filename), 10)
+    directories: List[str] = [root]
+    for level in range(depth):
+        directories.append(os.path.join(directories[-1], f"level{level}"))
+        os.mkdir(directories[-1])
+        # some noise, as in a real source tree
+        for name in ("setup.py", "README.md", "module.py"):
+            with open(os.path.join(directories[-1], name), "w"):
+                pass
+    # backdate the tree, as directories modified in the last seconds are not memoized
+    past: float = time.time() - 60
+    for directory in directories:
+        os.utime(directory, (past, past))
+    return directories[-1]
@@ -2,7 +2,7 @@ from typing import Final, List
 
 import nox
 
-FILES: Final[List[str]] = ["readenv", "tests", "noxfile.py"]
+FILES: Final[List[str]] = ["readenv", "tests", "benchmarks", "noxfile.py"]
 PYTHON: Final[List[str]] = ["3.8", "3.9", "3.10", "3.11", "3.12", "3.13"]
 
 nox.options.sessions = ["lint", "tests"]
@@ -30,3 +30,10 @@ def lint(session: nox.Session) -> None:
     session.run("ruff", "check", *FILES)
     session.run("ruff", "format", "--check", *FILES)
     session.run("mypy", *FILES)
+
+
+@nox.session(python=["3.12"])
+def benchmarks(session: nox.Session) -> None:
+    """Run the benchmarks, failing on regressions over the stored baseline (pass --save to update it)"""
+    session.install(".")
+    session.run("python", "-m", "benchmarks", *session.posargs)
@@ -19,22 +19,76 @@
 # THE SOFTWARE.
 
 import builtins
-from typing import Final
+from typing import Any, Final, Mapping, TYPE_CHECKING
 
-from ._environ import Environ, environ  # noqa: F401
+from ._cache import CastCache, ParseCache, SecretCache  # noqa: F401
+from ._discovery import Discovery  # noqa: F401
+from ._environ import Applied, Changes, Environ, environ  # noqa: F401
+from ._expand import ExpansionError  # noqa: F401
+from ._parser import ParseError  # noqa: F401
+from ._stats import Stats  # noqa: F401
 from ._version import get_version, VersionType
 
+if TYPE_CHECKING:
+    from ._bulk import BulkResult, load_many  # noqa: F401
+    from ._index import KeyIndex  # noqa: F401
+    from ._networks import Networks  # noqa: F401
+    from ._overlay import Overlay  # noqa: F401
+    from ._schema import Config, Field, Schema, SchemaError  # noqa: F401
+    from ._shared import attach, publish  # noqa: F401
+    from ._snapshot import Snapshot, SnapshotError  # noqa: F401
+    from ._watch import Watcher  # noqa: F401
+
+# imported on first access, as they pull in modules (ie concurrent.futures) which
+# `import readenv.loads` doesn't need
+_LAZY: Final[Mapping[builtins.str, builtins.str]] = {
+    "BulkResult": "._bulk",
+    "load_many": "._bulk",
+    "KeyIndex": "._index",
+    "Networks": "._networks",
+    "Overlay": "._overlay",
+    "Config": "._schema",
+    "Field": "._schema",
+    "Schema": "._schema",
+    "SchemaError": "._schema",
+    "attach": "._shared",
+    "publish": "._shared",
+    "Snapshot": "._snapshot",
+    "SnapshotError": "._snapshot",
+    "Watcher": "._watch",
+}
+
+
+def __getattr__(name: builtins.str) -> Any:
+    module: Any = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value: Any = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+array = environ.array
 bool = environ.bool
 bytes = environ.bytes
 decimal = environ.decimal
 dict = environ.dict
 float = environ.float
+frozenset = environ.frozenset
 int = environ.int
 json = environ.json
 list = environ.list
+networks = environ.networks
 tuple = environ.tuple
 str = environ.str
 load = environ.load
+aload = environ.aload
+reload = environ.reload
+areload = environ.areload
+watch = environ.watch
+# rebound by environ.instrument() and uninstrument()
 get = environ.get
 set = environ.set
 setdefault = environ.setdefault
@@ -0,0 +1,188 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import argparse
+import os
+import shlex
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ._discovery import Discovery
+from ._environ import Environ
+from ._expand import ExpansionError
+from ._parser import _quoted_assignment, parse, ParseError
+
+__all__ = ["main"]
+
+
+def _files(args: argparse.Namespace) -> Sequence[str]:
+    return args.files or (".env", ".env.local")
+
+
+def _exec(args: argparse.Namespace) -> int:
+    command: List[str] = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        print("readenv exec: missing command", file=sys.stderr)
+        return 2
+    env: Environ = Environ(os.environ)
+    env.load(*_files(args), override=args.override)
+    os.execvpe(command[0], command, os.environ)
+    return 0  # pragma: no cover
+
+
+def _env_value(key: str, value: str) -> str:
+    # as read back by the parser: a value quoted twice is unescaped, a single quoted one can span lines
+    if "\n" not in value and "\r" not in value:
+        if value.startswith("'"):
+            return "''" + value.replace("\\", "\\\\") + "''"
+        return value
+    lines: List[str] = value.split("\n")
+    # files are read with universal newlines, so \r can't be written; every line but the last one
+    # must not end with a quote, and the following ones (the last one with the closing quote)
+    # must not start a KEY='... value of their own
+    following: List[str] = lines[1:-1] + [lines[-1] + "'"]
+    if "\r" in value or any(line.endswith("'") for line in lines[:-1]) or any(map(_quoted_assignment, following)):
+        raise ValueError(f"{key}: the value cannot be written in the env format, use --format json")
+    return f"'{value}'"
+
+
+_FORMATS: Dict[str, Callable[[Dict[str, str]], str]] = {
+    "env": lambda values: "".join(f"{key}={_env_value(key, value)}\n" for key, value in values.items()),
+    "shell": lambda values: "".join(f"export {key}={shlex.quote(value)}\n" for key, value in values.items()),
+}
+
+
+def _dump(args: argparse.Namespace) -> int:
+    env: Environ = Environ(os.environ)
+    values: Dict[str, str] = env.expand(env._read(env._resolve(_files(args))))
+    if args.format == "json":
+        import json
+
+        output: str = json.dumps(values, indent=2) + "\n"
+    else:
+        try:
+            output = _FORMATS[args.format](values)
+        except ValueError as e:
+            print(f"readenv dump: {e}", file=sys.stderr)
+            return 1
+    # a single write, so the output of a pipe is never interleaved
+    sys.stdout.write(output)
+    sys.stdout.flush()
+    return 0
+
+
+def _check(args: argparse.Namespace) -> int:
+    env: Environ = Environ(os.environ)
+    errors: List[str] = []
+    values: Dict[str, str] = {}
+    for filename in _files(args):
+        paths: List[str] = env._resolve([filename])
+        if not paths:
+            # the default files are optional, as for load()
+            if args.files:
+                errors.append(f"{filename}: not found")
+            continue
+        failures: List[ParseError] = []
+        try:
+            with open(paths[0]) as f:
+                values.update(parse(f, filename=paths[0], strict=True, errors=failures))
+        except OSError as e:
+            errors.append(f"{filename}: {e}")
+        errors.extend(str(failure) for failure in failures)
+    try:
+        env.expand(values)
+    except ExpansionError as e:
+        errors.append(str(e))
+    if errors:
+        sys.stderr.write("".join(f"{error}\n" for error in errors))
+        return 1
+    print(f"{len(values)} variable(s) ok")
+    return 0
+
+
+def _best(func: Callable[[], object], number: int) -> float:
+    timings: List[float] = []
+    for _ in range(number):
+        start: float = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _bench(args: argparse.Namespace) -> int:
+    files: Sequence[str] = _files(args)
+    discovery: Discovery = Discovery()
+    cold: float = _best(lambda: Discovery().find(files), args.number)
+    discovery.find(files)
+    warm: float = _best(lambda: discovery.find(files), args.number)
+    env: Environ = Environ({})
+    paths: List[str] = env._resolve(files)
+    lines: List[str] = [
+        f"discovery (cold)  {cold * 1e6:10.1f} us",
+        f"discovery (warm)  {warm * 1e6:10.1f} us",
+    ]
+    for path in paths:
+        elapsed: float = _best(lambda: env._read([path]), args.number)  # noqa: B023
+        lines.append(f"parse {path}  {elapsed * 1e6:10.1f} us")
+    elapsed = _best(lambda: Environ({}).load(*files), args.number)
+    lines.append(f"load              {elapsed * 1e6:10.1f} us")
+    print("\n".join(lines))
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="python -m readenv")
+    files: argparse.ArgumentParser = argparse.ArgumentParser(add_help=False)
+    files.add_argument(
+        "-f",
+        "--file",
+        action="append",
+        dest="files",
+        metavar="FILE",
+        help="env file to load, searched from the current directory up (repeatable) [default: .env .env.local]",
+    )
+    commands = parser.add_subparsers(dest="subcommand", required=True)
+
+    command: argparse.ArgumentParser = commands.add_parser(
+        "exec", parents=[files], help="load the env files and replace this process with a command"
+    )
+    command.add_argument("--override", action="store_true", help="override the variables already set")
+    command.add_argument("command", nargs=argparse.REMAINDER, help="the command and its arguments")
+    command.set_defaults(func=_exec)
+
+    command = commands.add_parser("dump", parents=[files], help="print the expanded values of the env files")
+    command.add_argument("--format", choices=("env", "json", "shell"), default="env")
+    command.set_defaults(func=_dump)
+
+    command = commands.add_parser("check", parents=[files], help="report every invalid line and reference")
+    command.set_defaults(func=_check)
+
+    command = commands.add_parser("bench", parents=[files], help="time discovery and parsing of the env files")
+    command.add_argument("-n", "--number", type=int, default=20, help="runs, the best one is reported")
+    command.set_defaults(func=_bench)
+
+    args: argparse.Namespace = parser.parse_args(argv)
+    result: int = args.func(args)
+    return result
+
+
+if __name__ == "__main__":
+    sys.exit(main())
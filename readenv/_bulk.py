@@ -0,0 +1,117 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import errno
+import os
+import pathlib
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+from ._environ import Environ
+from ._parser import parse
+
+__all__ = ["BulkResult", "load_many"]
+
+Filenames = Sequence[Union[str, pathlib.PurePath]]
+# per name, either the values read or the error raised
+_Outcome = Tuple[str, Optional[Dict[str, str]], Optional[BaseException]]
+
+
+class BulkResult(NamedTuple):
+    environs: Dict[str, Environ]
+    errors: Dict[str, BaseException]
+
+
+def _read_strict(env: Environ, filenames: Filenames) -> Dict[str, str]:
+    # unlike Environ.load, the files are listed explicitly: one which is not found or can't be read fails the set
+    names: List[str] = [os.fspath(filename) for filename in filenames]
+    found: Dict[str, Optional[str]] = env.discovery.find(name for name in names if not os.path.isabs(name))
+    values: Dict[str, str] = {}
+    for name in names:
+        path: Optional[str] = name if os.path.isabs(name) else found[name]
+        if path is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), name)
+        with open(path) as f:
+            values.update(parse(f, filename=path))
+    return env.expand(values)
+
+
+def _read_chunk(chunk: Sequence[Tuple[str, Filenames]]) -> List[_Outcome]:
+    env: Environ = Environ()
+    outcomes: List[_Outcome] = []
+    for name, filenames in chunk:
+        try:
+            outcomes.append((name, _read_strict(env, filenames), None))
+        except Exception as e:
+            outcomes.append((name, None, e))
+    return outcomes
+
+
+def load_many(
+    filesets: Mapping[str, Filenames],
+    *,
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    pool: str = "process",
+    executor: Optional[Executor] = None,
+) -> BulkResult:
+    """Load each set of filenames in a new Environ, reading them in parallel.
+
+    Files are read and parsed in a new pool of ``workers`` processes (or threads, with
+    ``pool="thread"``) [default=os.cpu_count()], or in executor when given, ``chunksize`` sets at a time.
+    Each Environ starts empty and gets its values expanded and set as by Environ.load,
+    so it can be reloaded later.
+    A set which fails (ie a file not found, or which can't be read, or a value which can't be expanded)
+    is reported in ``errors`` instead of aborting the whole batch.
+    """
+    if pool not in ("process", "thread"):
+        raise ValueError(f"pool must be 'process' or 'thread', not {pool!r}")
+    items: List[Tuple[str, Filenames]] = [
+        (name, tuple(os.fspath(f) for f in files)) for name, files in filesets.items()
+    ]
+    chunks: List[List[Tuple[str, Filenames]]] = [items[i : i + chunksize] for i in range(0, len(items), chunksize)]
+    result: BulkResult = BulkResult({}, {})
+    if not chunks:
+        return result
+    if executor is not None:
+        _collect(result, executor, chunks, filesets)
+        return result
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    with ProcessPoolExecutor(workers) if pool == "process" else ThreadPoolExecutor(workers) as new:
+        _collect(result, new, chunks, filesets)
+    return result
+
+
+def _collect(
+    result: BulkResult,
+    executor: Executor,
+    chunks: List[List[Tuple[str, Filenames]]],
+    filesets: Mapping[str, Filenames],
+) -> None:
+    for outcomes in executor.map(_read_chunk, chunks):
+        for name, values, error in outcomes:
+            if values is None:
+                assert error is not None
+                result.errors[name] = error
+                continue
+            env: Environ = Environ(values)
+            env._loaded = dict(values)
+            env._filenames = filesets[name]
+            result.environs[name] = env
@@ -0,0 +1,354 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from collections import OrderedDict
+import os
+import sys
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Generic, Hashable, List, Mapping, Optional, Set, Tuple, TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+__all__ = ["CastCache", "LRU", "ParseCache", "SecretCache", "user_cache_dir"]
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+StatKey = Tuple[str, int, int, int]
+Pairs = Tuple[Tuple[str, str], ...]
+
+_FORMAT: int = 2
+
+
+def user_cache_dir() -> str:
+    if sys.platform == "win32":
+        base: str = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "readenv")
+
+
+def _owned(stat: os.stat_result) -> bool:
+    # cache files hold the parsed values, secrets included: only the ones of the current user are trusted
+    return not hasattr(os, "getuid") or stat.st_uid == os.getuid()
+
+
+class LRU(Generic[K, V]):
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize: int = maxsize
+        self.evictions: int = 0
+        self._data: "OrderedDict[K, V]" = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: K) -> Optional[V]:
+        with self._lock:
+            return self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class ParseCache:
+    """Cache of parsed env files, keyed on (path, st_mtime_ns, st_size, st_ino).
+
+    Entries live in a bounded in-process LRU and, when ``directory`` is set, in one
+    json file per env file under that directory, to be shared by short-lived processes.
+    The directory and the files are created readable by the current user only, and the ones
+    owned by other users are ignored.
+    """
+
+    def __init__(self, maxsize: int = 128, *, directory: Optional[str] = None) -> None:
+        self.directory: Optional[str] = directory
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self._entries: LRU[StatKey, Pairs] = LRU(maxsize)
+
+    @staticmethod
+    def key(path: str, stat: os.stat_result) -> StatKey:
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def get(self, key: StatKey) -> Optional[Pairs]:
+        pairs: Optional[Pairs] = self._entries.get(key)
+        if pairs is None and self.directory is not None:
+            pairs = self._read(key)
+            if pairs is not None:
+                self.disk_hits += 1
+                self._entries.put(key, pairs)
+        if pairs is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return pairs
+
+    def put(self, key: StatKey, pairs: Pairs) -> None:
+        self._entries.put(key, pairs)
+        if self.directory is not None:
+            self._write(key, pairs)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self._entries.evictions,
+            "size": len(self._entries),
+        }
+
+    def _filename(self, key: StatKey) -> str:
+        import hashlib
+
+        assert self.directory is not None
+        return os.path.join(self.directory, hashlib.sha1(key[0].encode("utf-8")).hexdigest() + ".json")
+
+    def _read(self, key: StatKey) -> Optional[Pairs]:
+        import json
+
+        filename: str = self._filename(key)
+        try:
+            if not _owned(os.stat(os.path.dirname(filename))):
+                return None
+            with open(filename, encoding="utf-8") as f:
+                if not _owned(os.fstat(f.fileno())):
+                    return None
+                data: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("format") != _FORMAT or tuple(data.get("key", ())) != key:
+            return None
+        return tuple((k, v) for k, v in data["pairs"])
+
+    def _write(self, key: StatKey, pairs: Pairs) -> None:
+        import json
+
+        filename: str = self._filename(key)
+        tmp: str = f"{filename}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(filename), mode=0o700, exist_ok=True)
+            if not _owned(os.stat(os.path.dirname(filename))):
+                return
+            fd: int = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with open(fd, "w", encoding="utf-8") as f:
+                json.dump({"format": _FORMAT, "key": key, "pairs": pairs}, f)
+            os.replace(tmp, filename)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+def freeze(value: Any) -> Any:
+    # array is imported by the converters that build arrays: when it is not imported, value can't be one
+    array: Any = sys.modules.get("array")
+    if array is not None and isinstance(value, array.array):
+        return memoryview(value).toreadonly()
+    if hasattr(value, "setflags"):
+        # a numpy array
+        value.setflags(write=False)
+        return value
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+class CastCache:
+    """Cache of converted values, keyed on (key, converter) and validated against the raw value.
+
+    Results are frozen (dicts become read-only mappings, lists become tuples, sets
+    frozensets and arrays read-only memoryviews), so the same object can be shared by every caller and thread.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._data: "OrderedDict[Tuple[str, Callable[..., Any]], Tuple[str, Any]]" = OrderedDict()
+        self._keys: Dict[str, Set[Callable[..., Any]]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def cast(self, key: str, raw: str, cast: Callable[..., Any]) -> Any:
+        ckey: Tuple[str, Callable[..., Any]] = (key, cast)
+        with self._lock:
+            entry: Optional[Tuple[str, Any]] = self._data.get(ckey)
+            if entry is not None and entry[0] == raw:
+                self._data.move_to_end(ckey)
+                self.hits += 1
+                return entry[1]
+        value: Any = cast(raw)
+        with self._lock:
+            self.misses += 1
+        return self.put(key, raw, cast, value)
+
+    def put(self, key: str, raw: str, cast: Callable[..., Any], value: Any) -> Any:
+        """Store value as the result of cast(raw) for key, returning it frozen"""
+        ckey: Tuple[str, Callable[..., Any]] = (key, cast)
+        value = freeze(value)
+        with self._lock:
+            self._data[ckey] = (raw, value)
+            self._data.move_to_end(ckey)
+            self._keys.setdefault(key, set()).add(cast)
+            while len(self._data) > self.maxsize:
+                (evicted, converter), _ = self._data.popitem(last=False)
+                self._discard(evicted, converter)
+                self.evictions += 1
+        return value
+
+    def items(self) -> List[Tuple[str, Callable[..., Any], str, Any]]:
+        """Return the (key, converter, raw value, converted value) entries, least recently used first"""
+        with self._lock:
+            return [(key, cast, raw, value) for (key, cast), (raw, value) in self._data.items()]
+
+    def _discard(self, key: str, cast: Callable[..., Any]) -> None:
+        converters: Optional[Set[Callable[..., Any]]] = self._keys.get(key)
+        if converters is not None:
+            converters.discard(cast)
+            if not converters:
+                del self._keys[key]
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            for cast in self._keys.pop(key, ()):
+                self._data.pop((key, cast), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._keys.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._data)}
+
+
+class SecretCache:
+    """Contents of the secret files referenced by ``KEY_FILE`` variables (ie Docker and Kubernetes secrets).
+
+    A file is read on first access, then its content is reused as long as its stat is unchanged,
+    so a rotated secret is picked up on the next access. Trailing newlines are stripped.
+    """
+
+    def __init__(self, suffix: str = "_FILE") -> None:
+        self.suffix: str = suffix
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: Dict[str, Tuple[StatKey, str]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def path(self, environ: Mapping[str, Any], key: str) -> Optional[str]:
+        """Return the path of the secret file of key, if any"""
+        if key.endswith(self.suffix):
+            # no KEY_FILE_FILE chains
+            return None
+        path: Any = environ.get(key + self.suffix)
+        return None if path is None else str(path)
+
+    def read(self, path: str) -> str:
+        key: StatKey = ParseCache.key(path, os.stat(path))
+        with self._lock:
+            entry: Optional[Tuple[StatKey, str]] = self._entries.get(path)
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry[1]
+        with open(path, encoding="utf-8") as f:
+            value: str = f.read().rstrip("\r\n")
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = (key, value)
+        return value
+
+    def get(self, environ: Mapping[str, Any], key: str) -> Optional[str]:
+        """Return the content of the secret file of key, or None when there is no ``KEY_FILE`` variable"""
+        path: Optional[str] = self.path(environ, key)
+        return None if path is None else self.read(path)
+
+    def _prefetch(self, path: str) -> bool:
+        try:
+            self.read(path)
+        except OSError:
+            # reported when the key is accessed
+            return False
+        return True
+
+    def prefetch(self, environ: Mapping[str, Any], *, executor: Optional["Executor"] = None) -> List[str]:
+        """Read the secret files of all the keys not set in environ, concurrently in a thread pool.
+
+        Return the keys whose file was read.
+        """
+        paths: Dict[str, str] = {}
+        length: int = len(self.suffix)
+        for name in list(environ):
+            if name.endswith(self.suffix) and len(name) > length and name[:-length] not in environ:
+                paths[name[:-length]] = str(environ[name])
+        if not paths:
+            return []
+        results: List[bool]
+        if executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(min(32, len(paths))) as pool:
+                results = list(pool.map(self._prefetch, paths.values()))
+        else:
+            results = list(executor.map(self._prefetch, paths.values()))
+        return [key for key, read in zip(paths, results) if read]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
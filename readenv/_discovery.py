@@ -0,0 +1,125 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import os
+import stat
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set
+
+__all__ = ["Discovery"]
+
+# listings of directories modified more recently than this are not memoized, as a file
+# created in the same mtime tick would not change it (as git does for "racy" entries)
+_RACY_NS: int = 2_000_000_000
+
+
+class Listing(NamedTuple):
+    mtime_ns: int
+    names: FrozenSet[str]
+    files: FrozenSet[str]
+
+
+class Discovery:
+    """Locate env files in the current working directory and its ancestors.
+
+    Every directory is listed once with ``os.scandir`` for all the requested filenames,
+    and listings are memoized until the directory itself changes (a file is added, removed
+    or renamed), so repeated lookups cost a single ``stat`` per directory.
+    The walk stops at ``root``, or at the first directory containing one of ``markers``
+    (ie ``(".git",)``), instead of going up to the filesystem root.
+    """
+
+    def __init__(self, *, root: Optional[str] = None, markers: Sequence[str] = ()) -> None:
+        self.root: Optional[str] = os.path.abspath(root) if root is not None else None
+        self.markers: FrozenSet[str] = frozenset(markers)
+        self._listings: Dict[str, Listing] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._listings.clear()
+
+    def _ancestors(self, start: str) -> Iterator[str]:
+        directory: str = start
+        while True:
+            yield directory
+            parent: str = os.path.dirname(directory)
+            if parent == directory:
+                return
+            directory = parent
+
+    def _listing(self, directory: str) -> Optional[Listing]:
+        try:
+            mtime_ns: int = os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+        listing: Optional[Listing] = self._listings.get(directory)
+        if listing is not None and listing.mtime_ns == mtime_ns:
+            return listing
+        names: Set[str] = set()
+        files: Set[str] = set()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    names.add(entry.name)
+                    try:
+                        if entry.is_file():
+                            files.add(entry.name)
+                    except OSError:
+                        pass
+        except OSError:
+            return None
+        listing = Listing(mtime_ns, frozenset(names), frozenset(files))
+        if time.time_ns() - mtime_ns > _RACY_NS:
+            with self._lock:
+                self._listings[directory] = listing
+        return listing
+
+    def _isfile(self, directory: str, filename: str, listing: Optional[Listing]) -> bool:
+        if listing is not None and os.sep not in filename and (os.altsep is None or os.altsep not in filename):
+            return filename in listing.files
+        # nested paths, or a directory which cannot be listed but can be traversed
+        try:
+            return stat.S_ISREG(os.stat(os.path.join(directory, filename)).st_mode)
+        except OSError:
+            return False
+
+    def _is_boundary(self, directory: str, listing: Optional[Listing]) -> bool:
+        if directory == self.root:
+            return True
+        return listing is not None and not self.markers.isdisjoint(listing.names)
+
+    def find(self, filenames: Iterable[str], start: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """Return the path of the nearest file for each of the relative filenames, or None"""
+        filenames = list(filenames)
+        found: Dict[str, Optional[str]] = dict.fromkeys(filenames)
+        pending: List[str] = list(found)
+        if not pending:
+            return found
+        for directory in self._ancestors(os.path.abspath(start) if start is not None else os.getcwd()):
+            listing: Optional[Listing] = self._listing(directory)
+            for filename in pending:
+                if self._isfile(directory, filename, listing):
+                    found[filename] = os.path.join(directory, filename)
+            pending = [filename for filename in pending if found[filename] is None]
+            if not pending or self._is_boundary(directory, listing):
+                break
+        return found
@@ -18,25 +18,29 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
-import base64
-import binascii
-from decimal import Decimal
-import json
+import contextlib
+import functools
 import os
-import pathlib
-import re
+import sys
+import threading
+import time
 from typing import (
     Any,
     Callable,
     Dict,
     Final,
+    FrozenSet,
     Iterable,
+    Iterator,
     List,
     Mapping,
     MutableMapping,
+    NamedTuple,
     Optional,
     Sequence,
+    TextIO,
     Tuple,
+    TYPE_CHECKING,
     TypeVar,
     Union,
 )
@@ -47,12 +51,27 @@ try:
 except ImportError:
     from typing_extensions import TypeAlias
 
-from ._version import PY39
-
-if PY39:
-    from re import Match, Pattern
-else:
-    from typing import Match, Pattern
+from ._cache import CastCache, Pairs, ParseCache, SecretCache, StatKey, user_cache_dir
+from ._discovery import Discovery
+from ._expand import expand
+from ._parser import parse
+from ._stats import Hook, Stats
+
+# modules only needed by some converters and features are imported when first used, to keep
+# `import readenv.loads` cheap: it is the first import of every process [see tests/test_import.py]
+if TYPE_CHECKING:
+    import array
+    from concurrent.futures import Executor
+    import contextvars
+    from decimal import Decimal
+    import pathlib
+    import weakref
+
+    from ._index import KeyIndex
+    from ._networks import Networks
+    from ._overlay import ContextMapping
+    from ._schema import Schema
+    from ._watch import Watcher
 
 __all__ = ["Environ"]
 
@@ -62,16 +81,15 @@ class Undefined:
 
 
 T = TypeVar("T", bound=Any)
-PatternType: TypeAlias = Pattern[str]
-MatchType: TypeAlias = Match[str]
 CastCallable: TypeAlias = Callable[..., Any]
 OptionalCastCallable: TypeAlias = Union[CastCallable, Undefined]
 _bool: TypeAlias = bool
+_float: TypeAlias = float
+_int: TypeAlias = int
 
 undefined: Final[Undefined] = Undefined()
-_RE1: Final[PatternType] = re.compile(r"\A(?:export )?([A-Za-z_0-9]+)=(.*)\Z")
-_RE2: Final[PatternType] = re.compile(r"\A'(.*)'\Z")
-_posix_variable: Final[PatternType] = re.compile(r"\$\{[^\}]*\}")
+_discovery: Final[Discovery] = Discovery()
+_scope_lock: Final[threading.Lock] = threading.Lock()
 
 
 def _cast_bool(value: Union[bool, int, str]) -> bool:
@@ -114,6 +132,81 @@ def _cast_tuple(
     return tuple(_cast_list(value, separator=separator, cast=cast))
 
 
+def _cast_frozenset(
+    value: Union[str, Iterable[str]],
+    *,
+    separator: str = ",",
+    cast: OptionalCastCallable = undefined,
+) -> FrozenSet[str]:
+    return frozenset(_cast_list(value, separator=separator, cast=cast))
+
+
+def _cast_networks(value: Union[str, Iterable[str]], *, separator: str = ",", strict: _bool = False) -> "Networks":
+    from ._networks import Networks
+
+    if isinstance(value, Networks):
+        return value
+    if isinstance(value, str):
+        return Networks((x for x in value.split(separator) if x.strip()), strict=strict)
+    return Networks(value, strict=strict)
+
+
+def _ints(items: Iterable[str]) -> Iterator[int]:
+    for item in items:
+        item = item.strip()
+        # a dash past the optional sign makes a range, ie 1000-1999 or -10--1
+        dash: int = item.find("-", 1)
+        if dash == -1:
+            if item:
+                yield int(item)
+            continue
+        start: int = int(item[:dash])
+        stop: int = int(item[dash + 1 :])
+        if stop < start:
+            raise ValueError(f"invalid range {item!r}")
+        yield from range(start, stop + 1)
+
+
+def _numbers(value: str, typecode: str) -> "Optional[array.array[Any]]":
+    # the json decoder converts a whole list of numbers in C, a lot faster than a call per item;
+    # anything else (ranges, empty items, other separators) is left to the item by item parsers
+    if "true" in value or "false" in value:
+        return None
+    import array
+    import json
+
+    try:
+        return array.array(typecode, json.loads(f"[{value}]"))
+    except (ValueError, TypeError):
+        return None
+
+
+def _cast_array(
+    value: Union[str, Iterable[Union[int, float]]],
+    *,
+    typecode: str = "q",
+    separator: str = ",",
+    numpy: _bool = False,
+) -> Any:
+    import array
+
+    result: Optional["array.array[Any]"]
+    if not isinstance(value, str):
+        result = array.array(typecode, value)
+    else:
+        result = _numbers(value, typecode) if separator == "," else None
+        if result is None and typecode in ("f", "d"):
+            result = array.array(typecode, map(float, filter(None, value.split(separator))))
+        elif result is None:
+            result = array.array(typecode, _ints(value.split(separator)))
+    if numpy:
+        # shares the array buffer, without copying it
+        import importlib
+
+        return importlib.import_module("numpy").frombuffer(result, dtype=typecode)
+    return result
+
+
 def _cast_dict(
     value: Union[Mapping[Any, Any], str],
     *,
@@ -128,6 +221,10 @@ def _cast_dict(
 
 
 def _cast_json(value: str) -> Any:
+    import base64
+    import binascii
+    import json
+
     try:
         value = base64.b64decode(value, validate=True).decode("utf-8")
     except binascii.Error:
@@ -135,9 +232,67 @@ def _cast_json(value: str) -> Any:
     return json.loads(value)
 
 
+@functools.lru_cache(maxsize=128)
+def _shared_converter(func: CastCallable, /, **kwargs: Any) -> CastCallable:
+    # share a single converter for each set of arguments, so it can be used as a cache key
+    return functools.partial(func, **kwargs)
+
+
+def _converter(func: CastCallable, /, **kwargs: Any) -> CastCallable:
+    try:
+        return _shared_converter(func, **kwargs)
+    except TypeError:
+        # an unhashable argument (ie a cast callable with __hash__ = None): a converter of its own, not cached
+        return functools.partial(func, **kwargs)
+
+
+class Changes(NamedTuple):
+    added: FrozenSet[str]
+    changed: FrozenSet[str]
+    removed: FrozenSet[str]
+
+    def __bool__(self) -> _bool:
+        return _bool(self.added or self.changed or self.removed)
+
+
+class Applied(NamedTuple):
+    written: int
+    skipped: int
+
+
 class Environ:
-    def __init__(self, environ: Union[Undefined, MutableMapping[str, Any]] = undefined) -> None:
+    def __init__(
+        self,
+        environ: Union[Undefined, MutableMapping[str, Any]] = undefined,
+        *,
+        parse_cache: Optional[ParseCache] = None,
+        discovery: Optional[Discovery] = None,
+        cast_cache: Optional[CastCache] = None,
+        snapshot: Optional[str] = None,
+        index: Optional["KeyIndex"] = None,
+        secrets: Optional[SecretCache] = None,
+    ) -> None:
         self.environ: MutableMapping[str, Any] = {} if isinstance(environ, Undefined) else environ
+        self.parse_cache: Optional[ParseCache] = parse_cache
+        self.discovery: Discovery = _discovery if discovery is None else discovery
+        self.cast_cache: Optional[CastCache] = cast_cache
+        self.snapshot: Optional[str] = snapshot
+        self.index: Optional["KeyIndex"] = index
+        self.secrets: Optional[SecretCache] = secrets
+        # values set by load(), to tell them apart from the ones set by others on reload()
+        self._loaded: Dict[str, str] = {}
+        self._filenames: Sequence[Union[str, "pathlib.PurePath"]] = (".env", ".env.local")
+        self.stats: Optional[Stats] = None
+        # bumped on every write done through this Environ, to invalidate what was derived from its values
+        self.generation: _int = 0
+        self._listeners: Optional["weakref.WeakSet[Any]"] = None
+        # per context, the stack of open transactions: the previous value (or undefined) of each key written
+        self._undo: Optional["contextvars.ContextVar[Tuple[Dict[str, Any], ...]]"] = None
+        # the mapping wrapping environ once scope() is used, and how many scopes are open in any context
+        self._context: Optional["ContextMapping"] = None
+        self._scopes: _int = 0
+        # the Environ this one is a namespace of
+        self._parent: Optional[Environ] = None
 
     def get(
         self,
@@ -150,78 +305,551 @@ class Environ:
         try:
             value = self.environ[key]
         except KeyError:
-            if isinstance(default, Undefined):
-                raise KeyError(f"Cannot find {key} in the environment")
-            value = default
+            # KEY_FILE=/run/secrets/key
+            value = None if self.secrets is None else self.secrets.get(self.environ, key)
+            if value is None:
+                if isinstance(default, Undefined):
+                    raise KeyError(f"Cannot find {key} in the environment")
+                return typing_cast(T, cast(default) if callable(cast) else default)
+        if self.cast_cache is not None and callable(cast) and isinstance(value, str):
+            return typing_cast(T, self.cast_cache.cast(key, value, cast))
         if callable(cast):
             value = cast(value)
         return typing_cast(T, value)
 
     def set(self, key: str, value: Any) -> None:
+        undo: Optional[Dict[str, Any]] = self._log()
+        if undo is not None:
+            self._record(undo, (key,))
         self.environ[key] = str(value)
+        if self.cast_cache is not None:
+            self.cast_cache.invalidate(key)
+        index: Optional["KeyIndex"] = self._indexed()
+        if index is not None:
+            index.add(key)
+        self._changed()
 
     def setdefault(self, key: str, value: Any) -> None:
+        if key in self.environ:
+            return
+        undo: Optional[Dict[str, Any]] = self._log()
+        if undo is not None:
+            self._record(undo, (key,))
         self.environ.setdefault(key, str(value))
-
-    def _replace(self, match: MatchType) -> str:
-        name = match.group()[2:-1]
-        return self.get(name, "")
-
-    def _get_content(self, filename: pathlib.Path) -> str:
-        content: str = ""
+        if self.cast_cache is not None:
+            self.cast_cache.invalidate(key)
+        index: Optional["KeyIndex"] = self._indexed()
+        if index is not None:
+            index.add(key)
+        self._changed()
+
+    def _delete(self, key: str) -> None:
+        undo: Optional[Dict[str, Any]] = self._log()
+        if undo is not None:
+            self._record(undo, (key,))
+        del self.environ[key]
+        if self.cast_cache is not None:
+            self.cast_cache.invalidate(key)
+        index: Optional["KeyIndex"] = self._indexed()
+        if index is not None:
+            index.discard(key)
+        self._changed()
+
+    def _changed(self) -> None:
+        self.generation += 1
+        if self._listeners:
+            for listener in list(self._listeners):
+                listener._invalidate()
+
+    def _invalidate(self) -> None:
+        # a namespace listens to the Environ it is a view of
+        self._changed()
+
+    def _scoped(self) -> _bool:
+        # whether some context (not necessarily the current one) sees values of its own
+        return self._scopes > 0 or (self._parent is not None and self._parent._scoped())
+
+    def _indexed(self) -> Optional["KeyIndex"]:
+        # the index tracks the keys outside of any scope: within one, they are the ones of its overlay
+        if self._context is not None and self._context.current.get(None) is not None:
+            return None
+        return self.index
+
+    def _listen(self, listener: Any) -> None:
+        # listener._invalidate() is called on each change, as long as listener is alive
+        if self._listeners is None:
+            import weakref
+
+            self._listeners = weakref.WeakSet()
+        self._listeners.add(listener)
+
+    def _lookup(self, key: str) -> Optional[str]:
+        value: Any = self.environ.get(key)
+        return None if value is None else str(value)
+
+    def _cached(self, path: str) -> Optional[Pairs]:
+        assert self.parse_cache is not None
         try:
-            with open(str(filename)) as f:
-                content = f.read()
-        except IOError:
-            pass
-        return content
-
-    def _get_content_from_parts(self, filename: str) -> str:
-        parts: Sequence[str] = pathlib.Path().cwd().parts
-        content: str = ""
-        for index in reversed(list(range(1, len(parts) + 1))):
-            path: pathlib.Path = pathlib.Path(os.path.join(*parts[:index], filename))
+            key: StatKey = self.parse_cache.key(path, os.stat(path))
+        except OSError:
+            return None
+        pairs: Optional[Pairs] = self.parse_cache.get(key)
+        if pairs is None:
             try:
-                with open(str(path)) as f:
-                    content = f.read()
-                    break
+                with open(path) as f:
+                    pairs = tuple(parse(f, filename=path))
             except IOError:
-                pass
-        return content
+                return None
+            self.parse_cache.put(key, pairs)
+        return pairs
+
+    def _resolve(self, filenames: Sequence[Union[str, "pathlib.PurePath"]]) -> List[str]:
+        names: List[str] = [os.fspath(filename) for filename in filenames]
+        start: float = time.perf_counter()
+        found: Dict[str, Optional[str]] = self.discovery.find(name for name in names if not os.path.isabs(name))
+        if self.stats is not None:
+            self.stats.discovered(found, time.perf_counter() - start)
+        paths: List[Optional[str]] = [name if os.path.isabs(name) else found[name] for name in names]
+        return [path for path in paths if path is not None]
+
+    def _parse_timed(self, path: str, *, strict: _bool = False) -> Pairs:
+        assert self.stats is not None
+        start: float = time.perf_counter()
+        if self.parse_cache is not None and not strict:
+            hits: int = self.parse_cache.hits
+            cached: Optional[Pairs] = self._cached(path)
+            if cached is None:
+                return ()
+            pairs: Pairs = cached
+            self.stats.file(
+                path, cached=self.parse_cache.hits > hits, time=time.perf_counter() - start, keys=len(pairs)
+            )
+            return pairs
+        try:
+            with open(path) as f:
+                content: str = f.read()
+        except IOError:
+            return ()
+        read: float = time.perf_counter()
+        pairs = tuple(parse(content.splitlines(), filename=path, strict=strict))
+        end: float = time.perf_counter()
+        self.stats.file(path, cached=False, read=read - start, parse=end - read, time=end - start, keys=len(pairs))
+        return pairs
+
+    def _parse(self, path: str, *, strict: _bool = False) -> Iterator[Tuple[str, str]]:
+        if self.stats is not None:
+            yield from self._parse_timed(path, strict=strict)
+            return
+        if self.parse_cache is not None and not strict:
+            yield from self._cached(path) or ()
+            return
+        try:
+            f: TextIO = open(path)
+        except IOError:
+            return
+        with f:
+            yield from parse(f, filename=path, strict=strict)
 
-    def _load(self, filename: Union[str, pathlib.PurePath]) -> Mapping[str, str]:
-        path: pathlib.Path = pathlib.Path(filename)
-        content: str = self._get_content(path) if path.is_absolute() else self._get_content_from_parts(str(filename))
+    def _load(self, filename: Union[str, "pathlib.PurePath"]) -> Mapping[str, str]:
         environ: Dict[str, str] = {}
+        for path in self._resolve([filename]):
+            environ.update(self._parse(path))
+        return self.expand(environ)
+
+    def parse(self, *filenames: Union[str, "pathlib.PurePath"], strict: _bool = False) -> Iterator[Tuple[str, str]]:
+        """Yield the (key, value) pairs of a list of filename.env, without expanding nor setting them"""
+        for path in self._resolve(filenames if filenames else (".env", ".env.local")):
+            yield from self._parse(path, strict=strict)
 
-        for line in content.splitlines():  # ???
-            m1: Optional[MatchType] = _RE1.match(line)
-            key: str
-            value: str
-            if m1:
-                key, value = m1.group(1), m1.group(2)
-                m2: Optional[MatchType] = _RE2.match(value)
-                if m2:
-                    value = m2.group(1)
-                m3: Optional[MatchType] = _RE2.match(value)
-                if m3:
-                    value = re.sub(r"\\(.)", r"\1", m3.group(1))
-                # expand values
-                environ[key] = _posix_variable.sub(self._replace, value)
+    def expand(self, values: Mapping[str, str]) -> Dict[str, str]:
+        """Expand the ${VAR} and ${VAR:-default} references of values, against this environment and values itself"""
+        return expand(values, self._lookup)
+
+    def _read(self, paths: Sequence[str]) -> Dict[str, str]:
+        environ: Dict[str, str] = {}
+        for path in paths:
+            environ.update(self._parse(path))
         return environ
 
-    def load(self, *filenames: Union[str, pathlib.PurePath]) -> None:
-        """Load a list of filename.env [default=(".env", ".env.local")]"""
-        filenames = filenames if filenames else (".env", ".env.local")
+    def _read_path(self, path: str) -> Pairs:
+        return tuple(self._parse(path))
 
-        # collect all vars
+    async def _aread(
+        self, filenames: Sequence[Union[str, "pathlib.PurePath"]], executor: Optional["Executor"]
+    ) -> Dict[str, str]:
+        import asyncio
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        paths: List[str] = await loop.run_in_executor(executor, self._resolve, filenames)
+        results: List[Pairs] = await asyncio.gather(
+            *(loop.run_in_executor(executor, self._read_path, path) for path in paths)
+        )
+        # merge in the same order as _read, whatever the order the files were read in
         environ: Dict[str, str] = {}
-        for filename in filenames:
-            environ.update(self._load(filename))
+        for pairs in results:
+            environ.update(pairs)
+        return environ
 
-        # set
-        for key, value in environ.items():
-            self.setdefault(key, value)
+    def _apply(self, values: Mapping[str, str], *, override: _bool = False) -> "Applied":
+        return self._store(self.expand(values), override=override)
+
+    def _store(self, values: Mapping[str, str], *, override: _bool = False) -> "Applied":
+        # diff first, then write only what differs: each os.environ write is an encode plus a putenv
+        current: Callable[[str], Any] = self.environ.get
+        writes: Dict[str, str] = {}
+        for key, value in values.items():
+            existing: Any = current(key)
+            if existing is None or (override and existing != value):
+                writes[key] = value
+        if writes:
+            undo: Optional[Dict[str, Any]] = self._log()
+            if undo is not None:
+                self._record(undo, writes)
+            self.environ.update(writes)
+            if self.cast_cache is not None:
+                for key in writes:
+                    self.cast_cache.invalidate(key)
+            index: Optional["KeyIndex"] = self._indexed()
+            if index is not None:
+                index.update(writes)
+            self._loaded.update(writes)
+            self._changed()
+        return Applied(len(writes), len(values) - len(writes))
+
+    def _reload(self, values: Mapping[str, str]) -> "Changes":
+        owned: Dict[str, str] = {key: value for key, value in self._loaded.items() if self.environ.get(key) == value}
+        # the previously loaded values are going to be replaced, so they don't take part in the expansion
+        expanded: Dict[str, str] = expand(values, lambda key: None if key in owned else self._lookup(key))
+        added: List[str] = []
+        changed: List[str] = []
+        for key, value in expanded.items():
+            if key in owned:
+                if owned[key] != value:
+                    self.set(key, value)
+                    changed.append(key)
+            elif key not in self.environ:
+                self.set(key, value)
+                added.append(key)
+            else:
+                continue
+            owned[key] = value
+        removed: List[str] = [key for key in owned if key not in expanded]
+        for key in removed:
+            self._delete(key)
+            del owned[key]
+        self._loaded = owned
+        return Changes(frozenset(added), frozenset(changed), frozenset(removed))
+
+    def load(self, *filenames: Union[str, "pathlib.PurePath"], override: _bool = False) -> "Applied":
+        """Load a list of filename.env [default=(".env", ".env.local")]
+
+        Keys already in the environment are left untouched, unless ``override`` is set.
+        Return how many keys were written and how many were skipped.
+        """
+        self._filenames = filenames if filenames else (".env", ".env.local")
+        if self.snapshot is not None:
+            applied: Optional[Applied] = self._load_snapshot(self.snapshot, self._filenames, override=override)
+            if applied is not None:
+                return applied
+        start: float = time.perf_counter()
+        paths: List[str] = self._resolve(self._filenames)
+        applied = self._apply(self._read(paths), override=override)
+        if self.stats is not None:
+            self.stats.load(paths, time.perf_counter() - start)
+        return applied
+
+    def _load_snapshot(
+        self, path: str, filenames: Sequence[Union[str, "pathlib.PurePath"]], *, override: _bool
+    ) -> Optional["Applied"]:
+        from ._snapshot import Snapshot, SnapshotError
+
+        try:
+            snapshot: Snapshot = Snapshot.read(path)
+        except (OSError, SnapshotError):
+            return None
+        if snapshot.names != tuple(os.fspath(filename) for filename in filenames):
+            return None
+        # discovery runs again: the snapshot holds only if the same files are found (ie in another
+        # directory, or once a .env.local is created, they are not)
+        if not snapshot.fresh(self._resolve(filenames)):
+            return None
+        if snapshot.expanded:
+            return self._store(snapshot.values, override=override)
+        return self._apply(snapshot.values, override=override)
+
+    def compile(self, output: str, *filenames: Union[str, "pathlib.PurePath"], expand: _bool = False) -> None:
+        """Write the merged values of a list of filename.env [default=(".env", ".env.local")] to a snapshot
+
+        load() with the same filenames reads the snapshot instead, as long as the files are unchanged.
+        Values are expanded on load, against the environment of the loading process, unless ``expand``
+        is set: then they are expanded once, against this environment.
+        """
+        from ._snapshot import Snapshot
+
+        filenames = filenames if filenames else (".env", ".env.local")
+        paths: List[str] = self._resolve(filenames)
+        values: Dict[str, str] = self._read(paths)
+        if expand:
+            values = self.expand(values)
+        Snapshot.build([os.fspath(filename) for filename in filenames], paths, values, expanded=expand).write(output)
+
+    async def aload(
+        self, *filenames: Union[str, "pathlib.PurePath"], executor: Optional["Executor"] = None, override: _bool = False
+    ) -> "Applied":
+        """Load a list of filename.env like load(), reading them concurrently in executor [default=asyncio's]"""
+        self._filenames = filenames if filenames else (".env", ".env.local")
+        return self._apply(await self._aread(self._filenames, executor), override=override)
+
+    def reload(self, *filenames: Union[str, "pathlib.PurePath"]) -> "Changes":
+        """Load again a list of filename.env [default=the last loaded ones], updating the values set by load()
+
+        Values set or changed by others since they were loaded are left untouched.
+        """
+        self._filenames = filenames if filenames else self._filenames
+        return self._reload(self._read(self._resolve(self._filenames)))
+
+    async def areload(
+        self, *filenames: Union[str, "pathlib.PurePath"], executor: Optional["Executor"] = None
+    ) -> "Changes":
+        """Like reload(), reading the files concurrently in executor [default=asyncio's]"""
+        self._filenames = filenames if filenames else self._filenames
+        return self._reload(await self._aread(self._filenames, executor))
+
+    def watch(
+        self,
+        *callbacks: Callable[[Changes], None],
+        interval: _float = 1.0,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        start: _bool = True,
+    ) -> "Watcher":
+        """Watch the files found by the last load(), reloading them in a thread when they change
+
+        The callbacks get the Changes of each reload; errors are passed to on_error [default=printed on stderr].
+        """
+        from ._watch import Watcher
+
+        watcher: Watcher = Watcher(
+            self, self._resolve(self._filenames), callbacks, interval=interval, on_error=on_error
+        )
+        return watcher.start() if start else watcher
+
+    def _log(self) -> Optional[Dict[str, Any]]:
+        # the undo log of the innermost transaction open in the current context
+        if self._undo is None:
+            return None
+        logs: Tuple[Dict[str, Any], ...] = self._undo.get(())
+        return logs[-1] if logs else None
+
+    def _record(self, undo: Dict[str, Any], keys: Iterable[str]) -> None:
+        for key in keys:
+            if key not in undo:
+                undo[key] = self.environ.get(key, undefined)
+
+    def _rollback(self, undo: Mapping[str, Any]) -> None:
+        index: Optional["KeyIndex"] = self._indexed()
+        for key, value in undo.items():
+            if isinstance(value, Undefined):
+                self.environ.pop(key, None)
+                if index is not None:
+                    index.discard(key)
+            else:
+                self.environ[key] = value
+                if index is not None:
+                    index.add(key)
+            if self.cast_cache is not None:
+                self.cast_cache.invalidate(key)
+        if undo:
+            self._changed()
+
+    @contextlib.contextmanager
+    def transaction(self, *, commit: _bool = False) -> Iterator["Environ"]:
+        """Undo, on exit, the writes done within the block by set(), setdefault(), load() and reload()
+
+        Only the keys written are recorded and restored, so the cost doesn't depend on the size
+        of the environment. With ``commit`` set the writes are kept, unless the block raises.
+        Transactions can be nested: a committed inner transaction is undone by the outer one.
+        They are kept per context (asyncio task or thread), so concurrent transactions only record
+        and undo their own writes.
+        """
+        if self._undo is None:
+            import contextvars
+
+            with _scope_lock:
+                if self._undo is None:
+                    self._undo = contextvars.ContextVar(f"readenv.transaction.{id(self)}")
+        undo: Dict[str, Any] = {}
+        loaded: Dict[str, str] = dict(self._loaded)
+        token: "contextvars.Token[Tuple[Dict[str, Any], ...]]" = self._undo.set(self._undo.get(()) + (undo,))
+        try:
+            yield self
+        except BaseException:
+            commit = False
+            raise
+        finally:
+            self._undo.reset(token)
+            if commit:
+                outer: Optional[Dict[str, Any]] = self._log()
+                if outer is not None:
+                    for key, value in undo.items():
+                        outer.setdefault(key, value)
+            else:
+                self._rollback(undo)
+                # only the keys written within this transaction: others may have been loaded meanwhile
+                for key in undo:
+                    if key in loaded:
+                        self._loaded[key] = loaded[key]
+                    else:
+                        self._loaded.pop(key, None)
+
+    def fork(self) -> "Environ":
+        """Return an Environ over a copy-on-write view of this environment
+
+        The fork sees this environment values, but its own writes and deletions
+        are kept apart; this environment is not copied, whatever its size.
+        """
+        from ._overlay import Overlay
+
+        env: Environ = Environ(
+            Overlay(self.environ),
+            parse_cache=self.parse_cache,
+            discovery=self.discovery,
+            cast_cache=self.cast_cache,
+            snapshot=self.snapshot,
+            secrets=self.secrets,
+        )
+        env._loaded = dict(self._loaded)
+        env._filenames = self._filenames
+        return env
+
+    def prefetch(self, *, executor: Optional["Executor"] = None) -> List[str]:
+        """Read the secret files of the ``KEY_FILE`` variables whose KEY is not set, concurrently
+
+        Files are read in executor [default=a new thread pool] and their contents are cached
+        [see readenv.SecretCache], so the first access doesn't block on opening them.
+        Return the keys whose file was read; without a secret cache, nothing is read.
+        """
+        if self.secrets is None:
+            return []
+        return self.secrets.prefetch(self.environ, executor=executor)
+
+    def keys(self, prefix: str = "") -> List[str]:
+        """Return the sorted keys starting with prefix
+
+        With an index [see readenv.KeyIndex] only the matching keys are visited,
+        otherwise all the keys of the environment are.
+        """
+        index: Optional["KeyIndex"] = self._indexed()
+        if index is None:
+            return sorted(key for key in self.environ if key.startswith(prefix))
+        return index.prefixed(prefix, self.environ)
+
+    def namespace(self, prefix: str) -> "Environ":
+        """Return an Environ over the keys starting with prefix, with the prefix stripped
+
+        The namespace is a live view: it sees every change of this environment,
+        and its writes are done on this environment, with the prefix added.
+        """
+        from ._index import Namespace
+
+        env: Environ = Environ(
+            Namespace(self, prefix),
+            parse_cache=self.parse_cache,
+            discovery=self.discovery,
+            # keys are stripped: they can't share the entries of this environment
+            cast_cache=None if self.cast_cache is None else CastCache(self.cast_cache.maxsize),
+            snapshot=self.snapshot,
+            secrets=self.secrets,
+        )
+        env._parent = self
+        self._listen(env)
+        return env
+
+    @contextlib.contextmanager
+    def scope(self, values: Optional[Mapping[str, Any]] = None, /, **overrides: Any) -> Iterator["Environ"]:
+        """Override values, and keep any write, in the current context (asyncio task or thread) within the block
+
+        Other tasks and threads, and the underlying mapping, are not affected; scopes can be nested.
+        """
+        from ._overlay import ContextMapping, Overlay
+
+        with _scope_lock:
+            if not isinstance(self.environ, ContextMapping):
+                # while any scope is open every access looks up the current context
+                self.environ = ContextMapping(self.environ)
+            mapping: ContextMapping = self.environ
+            self._context = mapping
+            self._scopes += 1
+        overlay: Overlay = Overlay(mapping.current.get(mapping.base))
+        for key, value in {**(values or {}), **overrides}.items():
+            overlay[key] = str(value)
+            if self.cast_cache is not None:
+                self.cast_cache.invalidate(key)
+        token: "contextvars.Token[MutableMapping[str, Any]]" = mapping.current.set(overlay)
+        self._changed()
+        try:
+            yield self
+        finally:
+            mapping.current.reset(token)
+            with _scope_lock:
+                self._scopes -= 1
+                if not self._scopes and self.environ is mapping:
+                    # the last scope closed: back to the underlying mapping, without the context lookups
+                    self.environ = mapping.base
+                    self._context = None
+            self._changed()
+
+    def _instrumented_get(
+        self,
+        key: str,
+        default: Union[T, Undefined] = undefined,
+        *,
+        cast: OptionalCastCallable = undefined,
+    ) -> T:
+        stats: Optional[Stats] = self.stats
+        if stats is None:
+            return Environ.get(self, key, default, cast=cast)
+        stats.access[key] += 1
+        if not callable(cast):
+            return Environ.get(self, key, default)
+        start: float = time.perf_counter()
+        try:
+            return Environ.get(self, key, default, cast=cast)
+        finally:
+            stats.cast(cast, time.perf_counter() - start)
+
+    def instrument(self, *hooks: Hook) -> Stats:
+        """Start collecting timings and counters, returned as a Stats object
+
+        hooks are called with each discovery, file and load event. Key accesses are
+        counted through Environ.get and the typed getters.
+        """
+        if self.stats is None:
+            self.stats = Stats(list(hooks))
+            self.stats.caches["parse_cache"] = lambda: self.parse_cache.stats() if self.parse_cache else {}
+            self.stats.caches["cast_cache"] = lambda: self.cast_cache.stats() if self.cast_cache else {}
+            self.stats.caches["secrets"] = lambda: self.secrets.stats() if self.secrets else {}
+            # shadow get() on this instance only, so that it costs nothing when not instrumented
+            vars(self)["get"] = self._instrumented_get
+            self._rebind_get()
+        else:
+            self.stats.hooks.extend(hooks)
+        return self.stats
+
+    def uninstrument(self) -> None:
+        """Stop collecting timings and counters"""
+        vars(self).pop("get", None)
+        self.stats = None
+        self._rebind_get()
+
+    def _rebind_get(self) -> None:
+        # readenv.get is bound to the default environment get(): rebound when it is shadowed or restored
+        package: Any = sys.modules.get(__package__ or "")
+        if self is environ and package is not None:
+            package.get = self.get
+
+    def resolve(self, schema: "Schema") -> Any:
+        """Resolve all the fields of schema in a single pass [see readenv.Schema]"""
+        return schema.resolve(self)
 
     def bool(self, key: str, default: Union[bool, int, str, Undefined] = undefined) -> bool:
         return self.get(key, default=default, cast=_cast_bool)  # type: ignore[return-value]
@@ -229,7 +857,9 @@ class Environ:
     def bytes(self, key: str, default: Union[bytes, Undefined] = undefined) -> bytes:
         return self.get(key, default=default, cast=bytes)
 
-    def decimal(self, key: str, default: Union[Decimal, int, str, Undefined] = undefined) -> Decimal:
+    def decimal(self, key: str, default: Union["Decimal", int, str, Undefined] = undefined) -> "Decimal":
+        from decimal import Decimal
+
         return self.get(key, default=default, cast=Decimal)  # type: ignore[return-value]
 
     def dict(
@@ -243,12 +873,25 @@ class Environ:
         return self.get(
             key,
             default=default,
-            cast=lambda value: _cast_dict(value, separator=separator, value_separator=value_separator),
+            cast=_converter(_cast_dict, separator=separator, value_separator=value_separator),
         )
 
     def float(self, key: str, default: Union[float, str, Undefined] = undefined) -> float:
         return self.get(key, default=default, cast=float)  # type: ignore[return-value]
 
+    def frozenset(
+        self,
+        key: str,
+        default: Union[str, Iterable[str], Undefined] = undefined,
+        *,
+        separator: str = ",",
+        cast: OptionalCastCallable = undefined,
+    ) -> FrozenSet[str]:
+        return typing_cast(
+            FrozenSet[str],
+            self.get(key, default=default, cast=_converter(_cast_frozenset, separator=separator, cast=cast)),
+        )
+
     def int(self, key: str, default: Union[int, str, Undefined] = undefined) -> int:
         return self.get(key, default=default, cast=int)  # type: ignore[return-value]
 
@@ -265,7 +908,21 @@ class Environ:
     ) -> List[str]:
         return typing_cast(
             List[str],
-            self.get(key, default=default, cast=lambda value: _cast_list(value, separator=separator, cast=cast)),
+            self.get(key, default=default, cast=_converter(_cast_list, separator=separator, cast=cast)),
+        )
+
+    def networks(
+        self,
+        key: str,
+        default: Union[str, Iterable[str], Undefined] = undefined,
+        *,
+        separator: str = ",",
+        strict: _bool = False,
+    ) -> "Networks":
+        """Return a separated list of IP networks (ie ``10.0.0.0/8,::1``) as Networks, to test addresses against"""
+        return typing_cast(
+            "Networks",
+            self.get(key, default=default, cast=_converter(_cast_networks, separator=separator, strict=strict)),
         )
 
     def tuple(
@@ -278,7 +935,27 @@ class Environ:
     ) -> Tuple[str]:
         return typing_cast(
             Tuple[str],
-            self.get(key, default=default, cast=lambda value: _cast_tuple(value, separator=separator, cast=cast)),
+            self.get(key, default=default, cast=_converter(_cast_tuple, separator=separator, cast=cast)),
+        )
+
+    def array(
+        self,
+        key: str,
+        default: Union[str, Iterable[Any], Undefined] = undefined,
+        *,
+        typecode: str = "q",
+        separator: str = ",",
+        numpy: _bool = False,
+    ) -> Any:
+        """Return a separated list of numbers as an array.array of typecode [default=signed 64 bit integers]
+
+        Integer items can be inclusive ranges, like ``8000-8099``. With ``numpy`` set the result is
+        a numpy array (numpy must be installed) over the same buffer.
+        """
+        return self.get(
+            key,
+            default=default,
+            cast=_converter(_cast_array, typecode=typecode, separator=separator, numpy=numpy),
         )
 
     def str(self, key: str, default: Union[str, Undefined] = undefined, *, multiline: _bool = False) -> str:
@@ -288,4 +965,18 @@ class Environ:
         return value
 
 
-environ = Environ(os.environ)
+def _default_parse_cache() -> ParseCache:
+    directory: Optional[str] = os.environ.get("READENV_CACHE_DIR") or None
+    if directory is None and os.environ.get("READENV_CACHE"):
+        directory = user_cache_dir()
+    return ParseCache(directory=directory)
+
+
+environ = Environ(
+    os.environ,
+    parse_cache=_default_parse_cache(),
+    snapshot=os.environ.get("READENV_SNAPSHOT") or None,
+    secrets=SecretCache() if os.environ.get("READENV_SECRETS") else None,
+)
+if os.environ.get("READENV_STATS"):
+    environ.instrument()
@@ -0,0 +1,156 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from typing import Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple, Union
+
+__all__ = ["ExpansionError", "expand"]
+
+
+class ExpansionError(ValueError):
+    def __init__(self, cycle: List[str]) -> None:
+        self.cycle: List[str] = cycle
+        super().__init__(f"Circular reference: {' -> '.join(cycle)}")
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (type(self), (self.cycle,))
+
+
+class Ref(NamedTuple):
+    name: str
+    # the template of ${name:-default}, or None for ${name}
+    default: Optional["Template"]
+
+
+Template = Tuple[Union[str, Ref], ...]
+
+
+def _closing(value: str, start: int) -> int:
+    # index of the } closing the ${ ending at start, accounting for nested ${...} in defaults
+    depth: int = 1
+    index: int = start
+    while depth:
+        opening: int = value.find("${", index)
+        closing: int = value.find("}", index)
+        if closing == -1:
+            return -1
+        if opening != -1 and opening < closing:
+            depth += 1
+            index = opening + 2
+        else:
+            depth -= 1
+            index = closing + 1
+    return index - 1
+
+
+def parse_template(value: str) -> Template:
+    segments: List[Union[str, Ref]] = []
+    index: int = 0
+    while True:
+        start: int = value.find("${", index)
+        end: int = -1 if start == -1 else _closing(value, start + 2)
+        if end == -1:
+            if index < len(value):
+                segments.append(value[index:])
+            return tuple(segments)
+        if start > index:
+            segments.append(value[index:start])
+        body: str = value[start + 2 : end]
+        sep: int = body.find(":-")
+        if sep == -1:
+            segments.append(Ref(body, None))
+        else:
+            segments.append(Ref(body[:sep], parse_template(body[sep + 2 :])))
+        index = end + 1
+
+
+def _names(template: Template) -> Iterator[str]:
+    for segment in template:
+        if isinstance(segment, Ref):
+            yield segment.name
+            if segment.default is not None:
+                yield from _names(segment.default)
+
+
+def expand(values: Mapping[str, str], lookup: Callable[[str], Optional[str]]) -> Dict[str, str]:
+    """Expand the ${VAR} and ${VAR:-default} references of a whole batch of values.
+
+    A reference resolves to ``lookup(name)`` when it is not None (the environment wins,
+    as loaded values never override it), otherwise to the batch value, which is expanded
+    first. References are resolved in dependency order, each value exactly once, so any
+    value can refer to any other (before or after it, in any file); circular references
+    raise ``ExpansionError``. A value referring to itself only sees ``lookup``, to allow
+    ``PATH=${PATH}:/opt/bin`` or ``LEVEL=${LEVEL:-info}``.
+    """
+    templates: Dict[str, Template] = {key: parse_template(value) for key, value in values.items() if "${" in value}
+    if not templates:
+        return dict(values)
+    external: Dict[str, Optional[str]] = {}
+
+    def resolve(name: str) -> Optional[str]:
+        try:
+            return external[name]
+        except KeyError:
+            value: Optional[str] = lookup(name)
+            external[name] = value
+            return value
+
+    resolved: Dict[str, str] = {key: value for key, value in values.items() if key not in templates}
+
+    def render(key: str, template: Template) -> str:
+        parts: List[str] = []
+        for segment in template:
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
+            value: Optional[str] = resolve(segment.name)
+            if value is None and segment.name != key:
+                value = resolved.get(segment.name)
+            if segment.default is not None and not value:
+                value = render(key, segment.default)
+            parts.append(value or "")
+        return "".join(parts)
+
+    def dependencies(key: str) -> Iterator[str]:
+        for name in _names(templates[key]):
+            if name != key and name in templates and resolve(name) is None:
+                yield name
+
+    for key in templates:
+        if key in resolved:
+            continue
+        # iterative depth first visit, so long chains of references don't hit the recursion limit
+        stack: List[Tuple[str, Iterator[str]]] = [(key, dependencies(key))]
+        visiting: Set[str] = {key}
+        while stack:
+            node, deps = stack[-1]
+            for dep in deps:
+                if dep in resolved:
+                    continue
+                if dep in visiting:
+                    cycle: List[str] = [name for name, _ in stack]
+                    raise ExpansionError(cycle[cycle.index(dep) :] + [dep])
+                visiting.add(dep)
+                stack.append((dep, dependencies(dep)))
+                break
+            else:
+                stack.pop()
+                visiting.discard(node)
+                resolved[node] = render(node, templates[node])
+    return {key: resolved[key] for key in values}
@@ -0,0 +1,126 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import bisect
+import threading
+from typing import Any, Iterable, Iterator, List, MutableMapping, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ._environ import Environ
+
+__all__ = ["KeyIndex", "Namespace"]
+
+
+class KeyIndex:
+    """A sorted index of the keys of an environment, to enumerate the ones with a prefix in O(log n + matches)
+
+    It is built from the environment on the first query, then kept up to date by the writes done
+    through the Environ (set, setdefault, load, reload, transactions); call clear() after writing
+    to the underlying mapping directly, to rebuild it.
+    """
+
+    def __init__(self) -> None:
+        self._keys: Optional[List[str]] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return 0 if self._keys is None else len(self._keys)
+
+    def _has(self, key: str) -> bool:
+        assert self._keys is not None
+        index: int = bisect.bisect_left(self._keys, key)
+        return index < len(self._keys) and self._keys[index] == key
+
+    def add(self, key: str) -> None:
+        with self._lock:
+            if self._keys is not None and not self._has(key):
+                bisect.insort(self._keys, key)
+
+    def update(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            if self._keys is None:
+                return
+            new: List[str] = [key for key in set(keys) if not self._has(key)]
+            if len(new) == 1:
+                bisect.insort(self._keys, new[0])
+            elif new:
+                # a sorted run plus the new keys: timsort merges them in O(n + k log k)
+                self._keys.extend(new)
+                self._keys.sort()
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            if self._keys is None:
+                return
+            index: int = bisect.bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                del self._keys[index]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys = None
+
+    def prefixed(self, prefix: str, mapping: Iterable[str]) -> List[str]:
+        """Return the sorted keys starting with prefix, building the index from mapping if needed"""
+        with self._lock:
+            if self._keys is None:
+                self._keys = sorted(mapping)
+            keys: List[str] = self._keys
+            matches: List[str] = []
+            for index in range(bisect.bisect_left(keys, prefix), len(keys)):
+                key: str = keys[index]
+                if not key.startswith(prefix):
+                    break
+                matches.append(key)
+            return matches
+
+
+class Namespace(MutableMapping[str, Any]):
+    """The keys of an Environ starting with prefix, without it [see Environ.namespace]
+
+    Lookups and writes go through the Environ, so the namespace is always up to date,
+    and its writes are recorded and indexed as any other.
+    """
+
+    def __init__(self, env: "Environ", prefix: str) -> None:
+        self.env: "Environ" = env
+        self.prefix: str = prefix
+
+    def __getitem__(self, key: str) -> Any:
+        return self.env.environ[self.prefix + key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.env.set(self.prefix + key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self.env._delete(self.prefix + key)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.prefix + key in self.env.environ
+
+    def __iter__(self) -> Iterator[str]:
+        start: int = len(self.prefix)
+        return iter([key[start:] for key in self.env.keys(self.prefix)])
+
+    def __len__(self) -> int:
+        return len(self.env.keys(self.prefix))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.prefix!r}, {dict(self)!r})"
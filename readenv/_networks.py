@@ -0,0 +1,97 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import bisect
+import ipaddress
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+__all__ = ["Networks"]
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+Address = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+
+class Networks:
+    """An immutable set of IP networks, answering ``address in networks`` with a binary search
+
+    The networks are merged, per IP version, into sorted disjoint intervals of addresses,
+    so a lookup is O(log n) whatever the number of networks and how they overlap.
+    """
+
+    __slots__ = ("networks", "_intervals")
+
+    def __init__(self, networks: Iterable[Union[str, Network]], *, strict: bool = False) -> None:
+        self.networks: Tuple[Network, ...] = tuple(
+            network
+            if isinstance(network, (ipaddress.IPv4Network, ipaddress.IPv6Network))
+            # host bits are allowed, unless strict, so 10.0.0.1/8 means 10.0.0.0/8
+            else ipaddress.ip_network(network.strip(), strict=strict)
+            for network in networks
+        )
+        ranges: Dict[int, List[Tuple[int, int]]] = {4: [], 6: []}
+        for network in self.networks:
+            ranges[network.version].append((int(network.network_address), int(network.broadcast_address)))
+        # per version, the starts and the ends of the merged intervals
+        self._intervals: Dict[int, Tuple[List[int], List[int]]] = {}
+        for version, intervals in ranges.items():
+            starts: List[int] = []
+            ends: List[int] = []
+            for start, end in sorted(intervals):
+                if ends and start <= ends[-1] + 1:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            self._intervals[version] = (starts, ends)
+
+    def _covers(self, version: int, first: int, last: int) -> bool:
+        starts, ends = self._intervals[version]
+        index: int = bisect.bisect_right(starts, first) - 1
+        return index >= 0 and last <= ends[index]
+
+    def __contains__(self, item: Any) -> bool:
+        """Tell whether an address, or a whole network, is in one of the networks; invalid addresses are not"""
+        if isinstance(item, str):
+            try:
+                item = ipaddress.ip_address(item.strip())
+            except ValueError:
+                return False
+        if isinstance(item, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+            return self._covers(item.version, int(item), int(item))
+        if isinstance(item, (ipaddress.IPv4Network, ipaddress.IPv6Network)):
+            return self._covers(item.version, int(item.network_address), int(item.broadcast_address))
+        return False
+
+    def __iter__(self) -> Iterator[Network]:
+        return iter(self.networks)
+
+    def __len__(self) -> int:
+        return len(self.networks)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Networks):
+            return NotImplemented
+        return self._intervals == other._intervals
+
+    def __hash__(self) -> int:
+        return hash(tuple((version, tuple(starts), tuple(ends)) for version, (starts, ends) in self._intervals.items()))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({[str(network) for network in self.networks]!r})"
@@ -0,0 +1,102 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import contextvars
+from typing import Any, Dict, Iterator, Mapping, MutableMapping, Set
+
+__all__ = ["ContextMapping", "Overlay"]
+
+
+class Overlay(MutableMapping[str, Any]):
+    """A copy-on-write view of a parent mapping: writes and deletions stay in the overlay
+
+    The parent is never copied nor modified, so creating an overlay costs the same
+    whatever its size; lookups of keys not written fall through to it.
+    """
+
+    def __init__(self, parent: Mapping[str, Any]) -> None:
+        self.parent: Mapping[str, Any] = parent
+        self.writes: Dict[str, Any] = {}
+        self.deleted: Set[str] = set()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self.writes[key]
+        except KeyError:
+            if key in self.deleted:
+                raise
+        return self.parent[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.writes[key] = value
+        self.deleted.discard(key)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self.writes.pop(key, None)
+        if key in self.parent:
+            self.deleted.add(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.writes or (key not in self.deleted and key in self.parent)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.writes
+        for key in self.parent:
+            if key not in self.writes and key not in self.deleted:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class ContextMapping(MutableMapping[str, Any]):
+    """Delegate to the mapping set for the current context (asyncio task or thread), or else to base"""
+
+    def __init__(self, base: MutableMapping[str, Any]) -> None:
+        self.base: MutableMapping[str, Any] = base
+        self.current: contextvars.ContextVar[MutableMapping[str, Any]] = contextvars.ContextVar(
+            f"readenv.scope.{id(self)}"
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        return self.current.get(self.base)[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.current.get(self.base)[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self.current.get(self.base)[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.current.get(self.base)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.current.get(self.base))
+
+    def __len__(self) -> int:
+        return len(self.current.get(self.base))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.current.get(self.base)!r})"
@@ -0,0 +1,158 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from collections import deque
+from typing import Any, Deque, Final, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+__all__ = ["ParseError", "parse"]
+
+_KEYCHARS: Final[FrozenSet[str]] = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_0123456789")
+
+
+class ParseError(ValueError):
+    def __init__(self, msg: str, *, lineno: int, colno: int, filename: Optional[str] = None) -> None:
+        where: str = f"{filename}: " if filename else ""
+        super().__init__(f"{where}{msg}: line {lineno} column {colno}")
+        self.msg: str = msg
+        self.lineno: int = lineno
+        self.colno: int = colno
+        self.filename: Optional[str] = filename
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (_parse_error, (self.msg, self.lineno, self.colno, self.filename))
+
+
+def _parse_error(msg: str, lineno: int, colno: int, filename: Optional[str]) -> ParseError:
+    return ParseError(msg, lineno=lineno, colno=colno, filename=filename)
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    chars: List[str] = []
+    index: int = 0
+    length: int = len(value)
+    while index < length:
+        char: str = value[index]
+        if char == "\\" and index + 1 < length and value[index + 1] != "\n":
+            chars.append(value[index + 1])
+            index += 2
+        else:
+            chars.append(char)
+            index += 1
+    return "".join(chars)
+
+
+def _invalid_column(line: str, start: int, eq: int) -> int:
+    if eq == -1:
+        return len(line) + 1
+    for index in range(start, eq):
+        if line[index] not in _KEYCHARS:
+            return index + 1
+    return eq + 1
+
+
+def _quoted_assignment(line: str) -> bool:
+    start: int = 7 if line.startswith("export ") else 0
+    eq: int = line.find("=", start)
+    key: str = line[start:eq]
+    return eq != -1 and bool(key) and _KEYCHARS.issuperset(key) and line.startswith("'", eq + 1)
+
+
+def parse(
+    lines: Iterable[str],
+    *,
+    filename: Optional[str] = None,
+    strict: bool = False,
+    errors: Optional[List[ParseError]] = None,
+) -> Iterator[Tuple[str, str]]:
+    """Yield the (key, value) pairs found in lines, one pass per line.
+
+    Lines which are not in the ``[export ]KEY=VALUE`` form are skipped, unless ``strict`` is set:
+    then anything other than blank lines and ``#`` comments raises a ``ParseError``, or is appended
+    to ``errors`` when given, to report all the errors of a file at once.
+    A value starting with a single quote which is not closed on the same line spans the
+    following lines up to the one ending with the closing quote. When a ``KEY='...`` line, starting
+    another quoted value, or the end of the file comes first, the value is taken literally, quote
+    included, and the following lines are parsed as usual; ``strict`` reports it as a ``ParseError`` instead.
+    """
+    lineno: int = 0
+    iterator: Iterator[str] = iter(lines)
+    # the lines read past a value which turned out not to be a multiline one, to be parsed again
+    pending: Deque[str] = deque()
+    while True:
+        line: Optional[str] = pending.popleft() if pending else next(iterator, None)
+        if line is None:
+            return
+        lineno += 1
+        line = line.rstrip("\r\n")
+        start: int = 7 if line.startswith("export ") else 0
+        eq: int = line.find("=", start)
+        key: str = line[start:eq]
+        if eq == -1 or not key or not _KEYCHARS.issuperset(key):
+            if strict and line.strip() and not line.lstrip().startswith("#"):
+                error: ParseError = ParseError(
+                    "Expecting KEY=VALUE",
+                    lineno=lineno,
+                    colno=_invalid_column(line, start, eq),
+                    filename=filename,
+                )
+                if errors is None:
+                    raise error
+                errors.append(error)
+            continue
+        value: str = line[eq + 1 :]
+        if value.startswith("'"):
+            if len(value) >= 2 and value.endswith("'"):
+                value = value[1:-1]
+                if len(value) >= 2 and value.startswith("'") and value.endswith("'"):
+                    value = _unescape(value[1:-1])
+            else:
+                first: int = lineno
+                parts: List[str] = [value[1:]]
+                following: List[str] = []
+                closed: bool = False
+                while True:
+                    line = pending.popleft() if pending else next(iterator, None)
+                    if line is None:
+                        break
+                    following.append(line)
+                    line = line.rstrip("\r\n")
+                    if _quoted_assignment(line):
+                        # KEY='... starts a new value: this one is not closed, and the lookahead ends here
+                        break
+                    if line.endswith("'"):
+                        closed = True
+                        parts.append(line[:-1])
+                        break
+                    parts.append(line)
+                if not closed:
+                    if strict:
+                        error = ParseError("Unterminated quoted value", lineno=first, colno=eq + 2, filename=filename)
+                        if errors is None:
+                            raise error
+                        errors.append(error)
+                    # not a multiline value: taken literally, and the following lines are parsed on their own
+                    yield key, value
+                    pending.extendleft(reversed(following))
+                    continue
+                lineno += len(following)
+                value = "\n".join(parts)
+        yield key, value
@@ -0,0 +1,203 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from typing import Any, ClassVar, Dict, Final, List, Mapping, Optional, Tuple, Type
+
+from . import _environ
+from ._cache import SecretCache
+from ._environ import (
+    _cast_bool,
+    _cast_dict,
+    _cast_frozenset,
+    _cast_list,
+    _cast_tuple,
+    CastCallable,
+    Environ,
+    OptionalCastCallable,
+    Undefined,
+    undefined,
+)
+
+__all__ = ["Config", "Field", "Schema", "SchemaError"]
+
+# builtin types whose constructor doesn't parse an environment value the readenv way
+_CONVERTERS: Final[Mapping[Any, CastCallable]] = {
+    bool: _cast_bool,
+    dict: _cast_dict,
+    frozenset: _cast_frozenset,
+    list: _cast_list,
+    tuple: _cast_tuple,
+}
+
+
+class SchemaError(ValueError):
+    def __init__(self, errors: Mapping[str, Exception]) -> None:
+        self.errors: Mapping[str, Exception] = errors
+        details: str = "\n".join(f"  {name}: {error}" for name, error in errors.items())
+        super().__init__(f"{len(errors)} invalid setting(s):\n{details}")
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (type(self), (self.errors,))
+
+
+class Field:
+    __slots__ = ("cast", "default", "key", "name")
+
+    def __init__(
+        self,
+        cast: OptionalCastCallable = undefined,
+        default: Any = undefined,
+        *,
+        key: Optional[str] = None,
+    ) -> None:
+        self.cast: Optional[CastCallable] = None if isinstance(cast, Undefined) else _CONVERTERS.get(cast, cast)
+        self.default: Any = default
+        self.key: Optional[str] = key
+        self.name: Optional[str] = None
+
+    @property
+    def required(self) -> bool:
+        return isinstance(self.default, Undefined)
+
+    def __set_name__(self, owner: Type[Any], name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Optional["Config"], owner: Type[Any]) -> Any:
+        # only reached when the value is not cached in the instance __dict__ [see Config]
+        if instance is None:
+            return self
+        return instance._resolve(self)
+
+
+class Settings:
+    __slots__: Tuple[str, ...] = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"cannot delete field {name!r}")
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __hash__(self) -> int:
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self) -> str:
+        fields: str = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def _asdict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Schema:
+    """A set of fields, resolved against an Environ in a single pass.
+
+    The schema is compiled once and can be reused with any number of Environ instances;
+    every resolution returns a frozen, ``__slots__`` based settings object, and collects
+    all the missing or invalid values in a single ``SchemaError``.
+    """
+
+    def __init__(self, name: str = "Settings", /, **fields: Field) -> None:
+        self.fields: Mapping[str, Field] = fields
+        self._compiled: Tuple[Tuple[str, str, Optional[CastCallable], Any], ...] = tuple(
+            (attr, field.key or attr, field.cast, field.default) for attr, field in fields.items()
+        )
+        self._settings: Type[Settings] = type(name, (Settings,), {"__slots__": tuple(fields)})
+
+    def resolve(self, environ: Environ) -> Any:
+        mapping = environ.environ
+        secrets: Optional[SecretCache] = environ.secrets
+        values: List[Tuple[str, Any]] = []
+        errors: Dict[str, Exception] = {}
+        for attr, key, cast, default in self._compiled:
+            value: Any = mapping.get(key, default)
+            if value is default and secrets is not None and key not in mapping:
+                try:
+                    secret: Optional[str] = secrets.get(mapping, key)
+                except OSError as e:
+                    errors[key] = e
+                    continue
+                if secret is not None:
+                    value = secret
+            if isinstance(value, Undefined):
+                errors[key] = KeyError(f"Cannot find {key} in the environment")
+                continue
+            if cast is not None:
+                try:
+                    value = cast(value)
+                except Exception as e:
+                    errors[key] = e
+                    continue
+            values.append((attr, value))
+        if errors:
+            raise SchemaError(errors)
+        settings: Settings = object.__new__(self._settings)
+        for attr, value in values:
+            object.__setattr__(settings, attr, value)
+        return settings
+
+
+class Config:
+    """Base class of settings classes, whose Field attributes are read from an Environ [default=readenv.environ].
+
+    Each field is resolved and cast on first access, then cached in the instance ``__dict__``,
+    so later accesses are plain attribute reads. The cache is cleared whenever a value is written
+    through the Environ (set(), setdefault(), load(), reload(), scope(), ...); writes done directly
+    to the underlying mapping are not seen. While a scope() is open, in any context, nothing is cached:
+    the values differ between contexts, and a cached attribute would be shared by all of them.
+    """
+
+    _fields: ClassVar[Mapping[str, Field]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._fields = {name: value for name, value in vars(cls).items() if isinstance(value, Field)}
+        for base in cls.__mro__[1:]:
+            for name, field in getattr(base, "_fields", {}).items():
+                cls._fields.setdefault(name, field)
+
+    def __init__(self, environ: Optional[Environ] = None) -> None:
+        self._environ: Environ = _environ.environ if environ is None else environ
+        self._environ._listen(self)
+
+    def _resolve(self, field: Field) -> Any:
+        assert field.name is not None
+        environ: Environ = self._environ
+        generation: int = environ.generation
+        value: Any = environ.get(field.key or field.name, field.default, cast=field.cast or undefined)
+        if environ.generation == generation and not environ._scoped():
+            self.__dict__[field.name] = value
+            # a write may have slipped in between the check and the store
+            if environ.generation != generation:
+                self.__dict__.pop(field.name, None)
+        return value
+
+    def _invalidate(self) -> None:
+        for name in self._fields:
+            self.__dict__.pop(name, None)
+
+    def __repr__(self) -> str:
+        fields: str = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
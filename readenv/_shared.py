@@ -0,0 +1,213 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import functools
+import io
+import os
+import pickle
+import struct
+from typing import Any, Callable, Dict, Final, FrozenSet, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from . import _environ
+from ._cache import CastCache
+from ._environ import _converter, Applied, Environ
+
+if TYPE_CHECKING:
+    from multiprocessing.shared_memory import SharedMemory
+
+__all__ = ["attach", "publish"]
+
+# magic, version and payload length
+_HEADER: Final[struct.Struct] = struct.Struct("<4sHQ")
+_MAGIC: Final[bytes] = b"RSHM"
+_VERSION: Final[int] = 2
+# the modules the published values and converters may come from: builtins, the types readenv converters
+# return and readenv itself; a segment can't make a worker import anything else [see _Unpickler]
+_MODULES: Final[FrozenSet[str]] = frozenset({"array", "builtins", "copyreg", "decimal", "ipaddress"})
+
+
+class _Unpickler(pickle.Unpickler):
+    def find_class(self, module: str, name: str) -> Any:
+        if module in _MODULES or module == __package__ or module.startswith(f"{__package__}."):
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"{module}.{name} is not a readenv value")
+
+
+def _loads(data: bytes) -> Any:
+    return _Unpickler(io.BytesIO(data)).load()
+
+
+def _thaw(value: Any) -> Any:
+    # frozen values (see _cache.freeze) are refrozen when put back in a CastCache
+    if isinstance(value, memoryview):
+        return value.obj
+    if isinstance(value, tuple):
+        return tuple(_thaw(v) for v in value)
+    if hasattr(value, "items") and not isinstance(value, dict):
+        return {k: _thaw(v) for k, v in value.items()}
+    return value
+
+
+def _spec(cast: Callable[..., Any]) -> Any:
+    # converters made by _converter are rebuilt through it, to get the very same (cached) object back
+    if isinstance(cast, functools.partial) and not cast.args:
+        return (cast.func, cast.keywords)
+    return cast
+
+
+def _portable(cast: Any) -> bool:
+    # builtins and readenv converters only: a worker may not be able to import anything else
+    # (ie a converter defined in the __main__ of the publishing process)
+    if isinstance(cast, functools.partial):
+        return (
+            not cast.args
+            and _portable(cast.func)
+            and all(_portable(value) for value in cast.keywords.values() if callable(value))
+        )
+    module: str = getattr(cast, "__module__", None) or ""
+    return module in _MODULES or module == f"{__package__}._environ"
+
+
+def _cast(spec: Any) -> Callable[..., Any]:
+    if isinstance(spec, tuple):
+        func, kwargs = spec
+        return _converter(func, **kwargs)
+    return spec  # type: ignore[no-any-return]
+
+
+def _sources(env: Environ, filenames: Sequence[str]) -> List[Tuple[str, int, int]]:
+    # the files found from the current directory, as (path, mtime_ns, size)
+    sources: List[Tuple[str, int, int]] = []
+    for path in env._resolve(filenames):
+        stat: os.stat_result = os.stat(path)
+        sources.append((os.path.abspath(path), stat.st_mtime_ns, stat.st_size))
+    return sources
+
+
+def publish(environ: Optional[Environ] = None, *, converted: bool = True) -> "SharedMemory":
+    """Publish the values loaded by environ [default=readenv.environ] in a new shared memory segment.
+
+    With ``converted`` set, the converted values held by its cast_cache are published too.
+    The segment name is set in ``READENV_SHM``, so that the worker processes started (forked
+    or spawned) from now on attach to it in ``import readenv.loads``, instead of reading and
+    parsing the env files again, as long as they find the same, unchanged, env files.
+    The segment is unlinked when this process exits, or by calling ``unlink()`` on the returned SharedMemory.
+    """
+    from multiprocessing.shared_memory import SharedMemory
+
+    env: Environ = _environ.environ if environ is None else environ
+    values: Dict[str, str] = {key: value for key, value in env._loaded.items() if env.environ.get(key) == value}
+    casts: List[bytes] = []
+    if converted and env.cast_cache is not None:
+        for key, cast, raw, value in env.cast_cache.items():
+            if not _portable(cast):
+                continue
+            try:
+                casts.append(pickle.dumps((key, raw, _spec(cast), _thaw(value)), pickle.HIGHEST_PROTOCOL))
+            except Exception:
+                # a value which can't be pickled: the workers convert it again
+                continue
+    filenames: List[str] = [os.fspath(filename) for filename in env._filenames]
+    payload: bytes = pickle.dumps(
+        {"filenames": filenames, "sources": _sources(env, filenames), "values": values, "casts": casts},
+        pickle.HIGHEST_PROTOCOL,
+    )
+    shm: SharedMemory = SharedMemory(create=True, size=_HEADER.size + len(payload))
+    buf: Optional[memoryview] = shm.buf
+    assert buf is not None
+    _HEADER.pack_into(buf, 0, _MAGIC, _VERSION, len(payload))
+    buf[_HEADER.size : _HEADER.size + len(payload)] = payload
+    os.environ["READENV_SHM"] = shm.name
+    return shm
+
+
+def _read(name: str) -> bytes:
+    if os.name == "nt":
+        from multiprocessing.shared_memory import SharedMemory
+
+        shm: SharedMemory = SharedMemory(name=name)
+        try:
+            return bytes(shm.buf or b"")
+        finally:
+            shm.close()
+    # mapped read-only, and without SharedMemory: it would start a resource tracker process
+    # to remove the segment when this process exits (before 3.13)
+    import _posixshmem  # type: ignore[import-not-found]
+    import mmap
+
+    fd: int = _posixshmem.shm_open(name if name.startswith("/") else f"/{name}", os.O_RDONLY, mode=0o600)
+    try:
+        with mmap.mmap(fd, os.fstat(fd).st_size, prot=mmap.PROT_READ) as mapping:
+            return mapping[:]
+    finally:
+        os.close(fd)
+
+
+def attach(name: Optional[str] = None, environ: Optional[Environ] = None) -> Applied:
+    """Set in environ [default=readenv.environ] the values published in the segment name [default=$READENV_SHM]
+
+    The values are set as by Environ.load (so they can be reloaded), and the published converted
+    values seed its cast_cache, which is created if needed. Return how many keys were written and skipped.
+    Raise ValueError when the segment is corrupt, or the env files found by this process are not the
+    published ones (ie another project started from the publishing process, or a file changed since):
+    nothing is set then. A converted value which can't be read is left out, to be converted again.
+    """
+    env: Environ = _environ.environ if environ is None else environ
+    name = os.environ["READENV_SHM"] if name is None else name
+    segment: bytes = _read(name)
+    try:
+        magic, version, length = _HEADER.unpack_from(segment)
+    except struct.error:
+        raise ValueError(f"{name} is not a readenv shared memory segment")
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"{name} is not a readenv shared memory segment")
+    # the whole segment is read and checked before anything is set
+    try:
+        data: Dict[str, Any] = _loads(segment[_HEADER.size : _HEADER.size + length])
+        filenames: Tuple[str, ...] = tuple(os.fspath(filename) for filename in data["filenames"])
+        values: Dict[str, str] = dict(data["values"])
+        published: List[Tuple[str, int, int]] = [tuple(source) for source in data["sources"]]
+        entries: List[bytes] = list(data["casts"])
+    except Exception:
+        raise ValueError(f"{name} is a corrupt readenv shared memory segment")
+    if not all(isinstance(key, str) and isinstance(value, str) for key, value in values.items()):
+        raise ValueError(f"{name} is a corrupt readenv shared memory segment")
+    try:
+        sources: Optional[List[Tuple[str, int, int]]] = _sources(env, filenames)
+    except OSError:
+        sources = None
+    if sources != published:
+        raise ValueError(f"{name} was published for other env files")
+    casts: List[Tuple[str, str, Callable[..., Any], Any]] = []
+    for entry in entries:
+        try:
+            key, raw, spec, value = _loads(entry)
+            casts.append((key, raw, _cast(spec), value))
+        except Exception:
+            continue
+    applied: Applied = env._store(values)
+    env._loaded.update((key, value) for key, value in values.items() if env.environ.get(key) == value)
+    env._filenames = filenames
+    if casts:
+        if env.cast_cache is None:
+            env.cast_cache = CastCache()
+        for key, raw, entry_cast, value in casts:
+            env.cast_cache.put(key, raw, entry_cast, value)
+    return applied
@@ -0,0 +1,170 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import hashlib
+import os
+import struct
+from typing import Dict, Final, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+__all__ = ["Snapshot", "SnapshotError"]
+
+# magic, version, flags, sha256 of the sources, then the lengths of the names, sources and values blobs
+_HEADER: Final[struct.Struct] = struct.Struct("<4sHH32sIII")
+_MAGIC: Final[bytes] = b"RENV"
+_VERSION: Final[int] = 1
+_EXPANDED: Final[int] = 0x1
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+class Source(NamedTuple):
+    path: str
+    mtime_ns: int
+    size: int
+
+
+def _join(items: Iterable[str]) -> bytes:
+    # NUL can't be part of an environment variable, so it is a safe separator
+    return "\0".join(items).encode("utf-8")
+
+
+def _split(blob: bytes) -> List[str]:
+    return blob.decode("utf-8").split("\0") if blob else []
+
+
+def digest(paths: Iterable[str]) -> bytes:
+    sha = hashlib.sha256()
+    for path in paths:
+        sha.update(path.encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            sha.update(f.read())
+        sha.update(b"\0")
+    return sha.digest()
+
+
+class Snapshot:
+    """Precompiled env files: the merged values of a set of files, with their stat and hash.
+
+    The binary format is a fixed header followed by three NUL separated utf-8 blobs
+    (requested filenames, sources and values), so loading it is one read and three splits.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        sources: Sequence[Source],
+        values: Mapping[str, str],
+        *,
+        digest: bytes,
+        expanded: bool = False,
+    ) -> None:
+        self.names: Tuple[str, ...] = tuple(names)
+        self.sources: Tuple[Source, ...] = tuple(sources)
+        self.values: Mapping[str, str] = values
+        self.digest: bytes = digest
+        self.expanded: bool = expanded
+
+    @classmethod
+    def build(
+        cls, names: Sequence[str], paths: Sequence[str], values: Mapping[str, str], *, expanded: bool
+    ) -> "Snapshot":
+        sources: List[Source] = []
+        for path in paths:
+            stat: os.stat_result = os.stat(path)
+            sources.append(Source(os.path.abspath(path), stat.st_mtime_ns, stat.st_size))
+        return cls(names, sources, values, digest=digest(paths), expanded=expanded)
+
+    def fresh(self, paths: Optional[Sequence[str]] = None) -> bool:
+        """Tell whether the sources are unchanged: same stat, or else same content
+
+        With ``paths`` (ie the files found by discovery now) they must also be the same files,
+        in the same order, as the sources.
+        """
+        if paths is not None and tuple(os.path.abspath(path) for path in paths) != tuple(
+            source.path for source in self.sources
+        ):
+            return False
+        try:
+            if all(
+                (stat.st_mtime_ns, stat.st_size) == (source.mtime_ns, source.size)
+                for stat, source in ((os.stat(source.path), source) for source in self.sources)
+            ):
+                return True
+            # ie copied into a container image, with new mtimes
+            return digest(source.path for source in self.sources) == self.digest
+        except OSError:
+            return False
+
+    def dumps(self) -> bytes:
+        items: List[str] = []
+        for key, value in self.values.items():
+            items.append(key)
+            items.append(value)
+        if any("\0" in item for item in items):
+            raise SnapshotError("values cannot contain NUL characters")
+        names: bytes = _join(self.names)
+        sources: bytes = _join(f"{path}\0{mtime_ns}\0{size}" for path, mtime_ns, size in self.sources)
+        values: bytes = _join(items)
+        flags: int = _EXPANDED if self.expanded else 0
+        header: bytes = _HEADER.pack(_MAGIC, _VERSION, flags, self.digest, len(names), len(sources), len(values))
+        return b"".join((header, names, sources, values))
+
+    @classmethod
+    def loads(cls, data: bytes) -> "Snapshot":
+        try:
+            magic, version, flags, sha, nlen, slen, vlen = _HEADER.unpack_from(data)
+        except struct.error:
+            raise SnapshotError("truncated snapshot")
+        if magic != _MAGIC:
+            raise SnapshotError("not a readenv snapshot")
+        if version != _VERSION:
+            raise SnapshotError(f"unsupported snapshot version {version}")
+        start: int = _HEADER.size
+        if len(data) != start + nlen + slen + vlen:
+            raise SnapshotError("truncated snapshot")
+        try:
+            names: List[str] = _split(data[start : start + nlen])
+            fields: List[str] = _split(data[start + nlen : start + nlen + slen])
+            items: List[str] = _split(data[start + nlen + slen :])
+            sources: List[Source] = [
+                Source(fields[i], int(fields[i + 1]), int(fields[i + 2])) for i in range(0, len(fields), 3)
+            ]
+        except (IndexError, ValueError) as e:
+            # ValueError includes UnicodeDecodeError
+            raise SnapshotError(f"corrupt snapshot: {e}") from e
+        if len(items) % 2:
+            raise SnapshotError("corrupt snapshot: odd number of values")
+        iterator = iter(items)
+        values: Dict[str, str] = dict(zip(iterator, iterator))
+        return cls(names, sources, values, digest=sha, expanded=bool(flags & _EXPANDED))
+
+    @classmethod
+    def read(cls, path: str) -> "Snapshot":
+        with open(path, "rb") as f:
+            return cls.loads(f.read())
+
+    def write(self, path: str) -> None:
+        data: bytes = self.dumps()
+        tmp: str = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
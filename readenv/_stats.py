@@ -0,0 +1,92 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from collections import Counter
+import functools
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+__all__ = ["Hook", "Stats"]
+
+# called with the event name ("discovery", "file", "load") and its data
+Hook = Callable[[str, Mapping[str, Any]], None]
+
+
+def converter_name(cast: Callable[..., Any]) -> str:
+    if isinstance(cast, functools.partial):
+        cast = cast.func
+    return getattr(cast, "__qualname__", None) or type(cast).__name__
+
+
+class Stats:
+    """Counters and timings (in seconds) collected by an instrumented Environ [see Environ.instrument]"""
+
+    def __init__(self, hooks: List[Hook]) -> None:
+        self.hooks: List[Hook] = hooks
+        self.discovery: Dict[str, Optional[str]] = {}
+        self.discovery_time: float = 0.0
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.loads: List[Dict[str, Any]] = []
+        self.access: "Counter[str]" = Counter()
+        self.casts: Dict[str, List[float]] = {}
+        self.caches: Dict[str, Callable[[], Mapping[str, int]]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def emit(self, event: str, data: Mapping[str, Any]) -> None:
+        for hook in self.hooks:
+            hook(event, data)
+
+    def discovered(self, found: Mapping[str, Optional[str]], elapsed: float) -> None:
+        self.discovery.update(found)
+        self.discovery_time += elapsed
+        self.emit("discovery", {"found": dict(found), "time": elapsed})
+
+    def file(self, path: str, **data: Any) -> None:
+        self.files[path] = data
+        self.emit("file", {"path": path, **data})
+
+    def load(self, paths: List[str], elapsed: float) -> None:
+        data: Dict[str, Any] = {"paths": paths, "time": elapsed}
+        self.loads.append(data)
+        self.emit("load", data)
+
+    def cast(self, cast: Callable[..., Any], elapsed: float) -> None:
+        name: str = converter_name(cast)
+        with self._lock:
+            timing: Optional[List[float]] = self.casts.get(name)
+            if timing is None:
+                self.casts[name] = [1, elapsed]
+            else:
+                timing[0] += 1
+                timing[1] += elapsed
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            casts: Dict[str, Dict[str, float]] = {
+                name: {"count": count, "time": elapsed} for name, (count, elapsed) in self.casts.items()
+            }
+        return {
+            "discovery": {"found": dict(self.discovery), "time": self.discovery_time},
+            "files": {path: dict(data) for path, data in self.files.items()},
+            "loads": [dict(data) for data in self.loads],
+            "access": dict(self.access),
+            "casts": casts,
+            "caches": {name: dict(stats()) for name, stats in self.caches.items()},
+        }
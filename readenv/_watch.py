@@ -0,0 +1,125 @@
+# Copyright (C) Raffaele Salmaso <raffaele.salmaso@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import os
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from ._cache import Pairs
+
+if TYPE_CHECKING:
+    from ._environ import Changes, Environ
+
+__all__ = ["Watcher"]
+
+# mtime, size and inode: an editor saving by renaming a new file over the old one changes the inode
+Signature = Optional[Tuple[int, int, int]]
+
+
+def _signature(path: str) -> Signature:
+    try:
+        stat: os.stat_result = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class Watcher:
+    """Poll the env files loaded by an Environ, reloading them when they change [see Environ.watch]
+
+    Every ``interval`` seconds the files are stat'ed; the ones which changed are parsed again,
+    and the changed keys are applied as by Environ.reload. All the edits seen by a poll are
+    coalesced into a single reload, and the callbacks are called once with its Changes.
+    """
+
+    def __init__(
+        self,
+        env: "Environ",
+        paths: Sequence[str],
+        callbacks: Sequence[Callable[["Changes"], None]],
+        *,
+        interval: float = 1.0,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+    ) -> None:
+        self.env: "Environ" = env
+        self.paths: Tuple[str, ...] = tuple(paths)
+        self.callbacks: List[Callable[["Changes"], None]] = list(callbacks)
+        self.interval: float = interval
+        self.on_error: Optional[Callable[[BaseException], None]] = on_error
+        self._signatures: Dict[str, Signature] = {path: _signature(path) for path in self.paths}
+        self._pairs: Dict[str, Pairs] = {path: env._read_path(path) for path in self.paths}
+        self._lock: threading.Lock = threading.Lock()
+        self._stop: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> Optional["Changes"]:
+        """Poll the files once, returning the Changes applied or None when no file changed"""
+        with self._lock:
+            modified: List[str] = []
+            for path in self.paths:
+                signature: Signature = _signature(path)
+                if signature != self._signatures[path]:
+                    self._signatures[path] = signature
+                    modified.append(path)
+            if not modified:
+                return None
+            for path in modified:
+                # a removed file contributes no values
+                self._pairs[path] = self.env._read_path(path)
+            values: Dict[str, str] = {}
+            for path in self.paths:
+                values.update(self._pairs[path])
+            changes: "Changes" = self.env._reload(values)
+        if changes:
+            for callback in self.callbacks:
+                callback(changes)
+        return changes
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                if self.on_error is None:
+                    import traceback
+
+                    traceback.print_exception(type(e), e, e.__traceback__, file=sys.stderr)
+                else:
+                    self.on_error(e)
+
+    def start(self) -> "Watcher":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="readenv-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "Watcher":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
@@ -18,6 +18,19 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import os
+
 from ._environ import environ
 
-environ.load()
+if os.environ.get("READENV_SHM"):
+    # a worker of a process which published its values [see readenv.publish]
+    from ._shared import attach
+
+    try:
+        attach()
+    except Exception:
+        # the segment is gone (ie the publishing process exited), corrupt or for other env files:
+        # attach() sets nothing then
+        environ.load()
+else:
+    environ.load()
@@ -18,14 +18,76 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
-from mypy.plugin import Plugin
+import os
+import threading
+from typing import List, Optional, Tuple, Type
 
-import readenv.loads  # noqa: F401
+from mypy.options import Options
+from mypy.plugin import Plugin, ReportConfigContext
+
+from ._environ import Environ, environ
+from ._snapshot import digest, Source
+
+__all__ = ["ReadenvPlugin", "plugin"]
+
+
+class Loaded:
+    """The env files loaded by the plugin, once per process: the builds of a process all share them.
+
+    The files are hashed again, and reloaded, only when their size or modification time change.
+    """
+
+    def __init__(self, env: Environ, *filenames: str) -> None:
+        self.env: Environ = env
+        self.filenames: Tuple[str, ...] = filenames
+        self.loaded: bool = False
+        self.sources: Optional[Tuple[Source, ...]] = None
+        self.digest: str = ""
+        self._lock: threading.Lock = threading.Lock()
+
+    def _stat(self) -> Tuple[Tuple[str, ...], Tuple[Source, ...]]:
+        paths: Tuple[str, ...] = tuple(self.env._resolve(self.filenames or self.env._filenames))
+        sources: List[Source] = []
+        for path in paths:
+            stat: os.stat_result = os.stat(path)
+            sources.append(Source(path, stat.st_mtime_ns, stat.st_size))
+        return paths, tuple(sources)
+
+    def refresh(self) -> str:
+        with self._lock:
+            if not self.loaded:
+                self.env.load(*self.filenames)
+                self.loaded = True
+                self.sources = None
+            try:
+                paths, sources = self._stat()
+                if sources != self.sources:
+                    if self.sources is not None:
+                        self.env.reload(*self.filenames)
+                    self.digest = digest(paths).hex()
+                    self.sources = sources
+            except OSError:
+                # a file removed or replaced while being read: an empty digest invalidates the cache,
+                # and the files are checked again on the next build
+                self.sources = ()
+                self.digest = ""
+            return self.digest
+
+
+_loaded: Loaded = Loaded(environ)
 
 
 class ReadenvPlugin(Plugin):
-    pass
+    def __init__(self, options: Options) -> None:
+        super().__init__(options)
+        # once per build, before the plugins listed after this one (ie django-stubs) read the environment:
+        # every module of the build reports the same digest
+        self.digest: str = _loaded.refresh()
+
+    def report_config_data(self, ctx: ReportConfigContext) -> str:
+        # the env files are part of the configuration: the incremental cache is invalidated when they change
+        return self.digest
 
 
-def plugin(version: str) -> Plugin:
+def plugin(version: str) -> Type[Plugin]:
     return ReadenvPlugin
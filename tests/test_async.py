@@ -0,0 +1,36 @@
+import asyncio
+import unittest
+
+import readenv
+
+from .utils import TempDirTestCase
+
+
+class AsyncLoadTestCase(TempDirTestCase):
+    def test_aload(self) -> None:
+        first = self.write(".env", "A=1\nB=1\nC=${A}\n")
+        second = self.write(".env.local", "B=2\n")
+        env = readenv.Environ({"A": "0"})
+        asyncio.run(env.aload(first, second))
+        expected = readenv.Environ({"A": "0"})
+        expected.load(first, second)
+        self.assertEqual(env.environ, expected.environ)
+        self.assertEqual(env.environ, {"A": "0", "B": "2", "C": "0"})
+
+    def test_areload(self) -> None:
+        path = self.write(".env", "A=1\nB=${A}\nC=3\nEXTERNAL=1\n")
+        env = readenv.Environ({"EXTERNAL": "0"})
+        env.load(path)
+        env.set("C", "changed")
+        self.write(".env", "A=2\nB=${A}\nC=4\nD=4\nEXTERNAL=2\n")
+        changes = asyncio.run(env.areload())
+        self.assertEqual(env.environ, {"A": "2", "B": "2", "C": "changed", "D": "4", "EXTERNAL": "0"})
+        self.assertEqual(changes, ({"D"}, {"A", "B"}, set()))
+        self.write(".env", "A=2\n")
+        self.assertEqual(env.reload(), (set(), set(), {"B", "D"}))
+        self.assertEqual(env.environ, {"A": "2", "C": "changed", "EXTERNAL": "0"})
+        self.assertFalse(env.reload())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+import unittest
+
+import readenv
+
+from .utils import TempDirTestCase
+
+
+class BulkTestCase(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.common = self.write("common.env", "DOMAIN=example.com\nURL=https://${TENANT}.${DOMAIN}\n")
+
+    def filesets(self) -> Dict[str, List[str]]:
+        filesets = {}
+        for i in range(10):
+            filesets[f"tenant{i}"] = [self.common, self.write(f"tenant{i}.env", f"TENANT=t{i}\n")]
+        filesets["broken"] = [self.write("broken.env", "A=${B}\nB=${A}\n")]
+        return filesets
+
+    def check(self, result: readenv.BulkResult) -> None:
+        self.assertEqual(len(result.environs), 10)
+        self.assertEqual(result.environs["tenant3"].str("URL"), "https://t3.example.com")
+        self.assertEqual(list(result.errors), ["broken"])
+        self.assertIsInstance(result.errors["broken"], readenv.ExpansionError)
+
+    def test_files(self) -> None:
+        result = readenv.load_many(
+            {"missing": ["missing-tenant.env"], "absent": ["/nonexistent/tenant.env"], "directory": [self.tmpdir.name]},
+            pool="thread",
+        )
+        self.assertEqual(result.environs, {})
+        missing = result.errors["missing"]
+        assert isinstance(missing, FileNotFoundError)
+        self.assertEqual(missing.filename, "missing-tenant.env")
+        self.assertIsInstance(result.errors["absent"], FileNotFoundError)
+        self.assertIsInstance(result.errors["directory"], OSError)
+
+    def test_threads(self) -> None:
+        self.check(readenv.load_many(self.filesets(), workers=2, chunksize=3, pool="thread"))
+
+    def test_executor(self) -> None:
+        with ThreadPoolExecutor(2) as executor:
+            self.check(readenv.load_many(self.filesets(), chunksize=3, executor=executor))
+
+    def test_processes(self) -> None:
+        self.check(readenv.load_many(self.filesets(), workers=2, chunksize=3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import stat
+import sys
+import unittest
+import unittest.mock
+
+import readenv
+from readenv._cache import LRU
+
+from .utils import TempDirTestCase
+
+
+class LRUTestCase(unittest.TestCase):
+    def test_eviction(self) -> None:
+        lru: LRU[str, int] = LRU(maxsize=2)
+        lru.put("a", 1)
+        lru.put("b", 2)
+        self.assertEqual(lru.get("a"), 1)
+        lru.put("c", 3)
+        self.assertEqual(lru.get("b"), None)
+        self.assertEqual(lru.get("a"), 1)
+        self.assertEqual(lru.evictions, 1)
+
+
+class ParseCacheTestCase(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.filename = self.write(".env", "A=1\nB=${A}\n")
+
+    def test_hits(self) -> None:
+        cache = readenv.ParseCache()
+        self.assertEqual(readenv.Environ({"A": "0"}, parse_cache=cache)._load(self.filename), {"A": "1", "B": "0"})
+        self.assertEqual(readenv.Environ({"A": "0"}, parse_cache=cache)._load(self.filename), {"A": "1", "B": "0"})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # values are expanded against the current environment
+        self.assertEqual(readenv.Environ({"A": "2"}, parse_cache=cache)._load(self.filename), {"A": "1", "B": "2"})
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_invalidation(self) -> None:
+        cache = readenv.ParseCache()
+        readenv.Environ(parse_cache=cache).load(self.filename)
+        self.write(".env", "A=10\n")
+        env = readenv.Environ(parse_cache=cache)
+        env.load(self.filename)
+        self.assertEqual(env.environ, {"A": "10"})
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+    def test_directory(self) -> None:
+        directory = os.path.join(self.tmpdir.name, "cache")
+        readenv.Environ(parse_cache=readenv.ParseCache(directory=directory)).load(self.filename)
+        cache = readenv.ParseCache(directory=directory)
+        env = readenv.Environ(parse_cache=cache)
+        env.load(self.filename)
+        self.assertEqual(env.environ, {"A": "1", "B": "1"})
+        self.assertEqual(cache.stats(), {"hits": 1, "disk_hits": 1, "misses": 0, "evictions": 0, "size": 1})
+
+    @unittest.skipIf(sys.platform == "win32", "file modes and owners are tested on posix only")
+    def test_private(self) -> None:
+        directory = os.path.join(self.tmpdir.name, "cache")
+        readenv.Environ(parse_cache=readenv.ParseCache(directory=directory)).load(self.filename)
+        self.assertEqual(stat.S_IMODE(os.stat(directory).st_mode), 0o700)
+        for name in os.listdir(directory):
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.join(directory, name)).st_mode), 0o600)
+        # the files of another user are ignored
+        with unittest.mock.patch("os.getuid", return_value=os.getuid() + 1):
+            cache = readenv.ParseCache(directory=directory)
+            readenv.Environ(parse_cache=cache).load(self.filename)
+        self.assertEqual(cache.stats()["disk_hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import types
+import unittest
+
+import readenv
+
+
+class CastCacheTestCase(unittest.TestCase):
+    def test_cache(self) -> None:
+        cache = readenv.CastCache()
+        env = readenv.Environ({"JSON": '{"a": [1, 2]}', "LIST": "1,2,3"}, cast_cache=cache)
+        value = env.json("JSON")
+        self.assertIs(env.json("JSON"), value)
+        self.assertIsInstance(value, types.MappingProxyType)
+        self.assertEqual(value, {"a": (1, 2)})
+        self.assertEqual(env.list("LIST", cast=int), (1, 2, 3))
+        self.assertIs(env.list("LIST", cast=int), env.list("LIST", cast=int))
+        self.assertEqual(env.list("LIST"), ("1", "2", "3"))
+        self.assertEqual(cache.stats(), {"hits": 3, "misses": 3, "evictions": 0, "size": 3})
+
+    def test_array(self) -> None:
+        env = readenv.Environ({"IDS": "1-3"}, cast_cache=readenv.CastCache())
+        value = env.array("IDS")
+        self.assertIs(env.array("IDS"), value)
+        self.assertEqual(value.tolist(), [1, 2, 3])
+        self.assertTrue(value.readonly)
+
+    def test_unhashable_cast(self) -> None:
+        class Upper:
+            __hash__ = None  # type: ignore[assignment]
+
+            def __call__(self, value: str) -> str:
+                return value.upper()
+
+        for cast_cache in (None, readenv.CastCache()):
+            env = readenv.Environ({"X": "a,b"}, cast_cache=cast_cache)
+            self.assertEqual(tuple(env.list("X", cast=Upper())), ("A", "B"))
+            self.assertEqual(env.tuple("X", cast=Upper()), ("A", "B"))
+
+    def test_invalidation(self) -> None:
+        cache = readenv.CastCache()
+        env = readenv.Environ({"INT": "1"}, cast_cache=cache)
+        self.assertEqual(env.int("INT"), 1)
+        env.set("INT", 2)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(env.int("INT"), 2)
+        # external changes are detected through the raw value
+        env.environ["INT"] = "3"
+        self.assertEqual(env.int("INT"), 3)
+        self.assertEqual(env.int("MISSING", 4), 4)
+        self.assertEqual(len(cache), 1)
+
+    def test_eviction(self) -> None:
+        cache = readenv.CastCache(maxsize=2)
+        env = readenv.Environ({"A": "1", "B": "2", "C": "3"}, cast_cache=cache)
+        self.assertEqual([env.int("A"), env.int("B"), env.int("C")], [1, 2, 3])
+        self.assertEqual((len(cache), cache.evictions), (2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import array
+import ipaddress
 import unittest
 
 import readenv
@@ -62,6 +64,42 @@ class CastTestCase(unittest.TestCase):
             self.assertEqual(readenv.tuple("TUPLE_ENV_4"), ("42", "43"))
             self.assertEqual(readenv.tuple("TUPLE_ENV_4", cast=int), (42, 43))
 
+    def test_array(self) -> None:
+        with load():
+            self.assertEqual(readenv.array("ARRAY_ENV_1"), array.array("q"))
+            self.assertEqual(readenv.array("ARRAY_ENV_2"), array.array("q", [1, 2, 3]))
+            self.assertEqual(readenv.array("ARRAY_ENV_2", typecode="H").typecode, "H")
+            self.assertEqual(readenv.array("ARRAY_ENV_3").tolist(), [-3, 1000, 1001, 1002, 1003, -2, -1, 7])
+            self.assertEqual(readenv.array("ARRAY_ENV_4", typecode="d"), array.array("d", [0.5, 1000.0]))
+            self.assertEqual(readenv.array("MISSING", [4, 5]), array.array("q", [4, 5]))
+            self.assertEqual(readenv.array("MISSING", "1;2-3", separator=";"), array.array("q", [1, 2, 3]))
+            self.assertRaises(ValueError, readenv.array, "TRUE_ENV_3")
+            self.assertRaises(ValueError, readenv.array, "ARRAY_ENV_5")
+            self.assertRaises(OverflowError, readenv.array, "ARRAY_ENV_3", typecode="B")
+
+    def test_frozenset(self) -> None:
+        with load():
+            self.assertEqual(readenv.frozenset("FROZENSET_ENV"), frozenset({"a.example.com", "b.example.com"}))
+            self.assertEqual(readenv.frozenset("LIST_ENV_4", cast=int), frozenset({42, 43}))
+            self.assertEqual(readenv.frozenset("LIST_ENV_1"), frozenset())
+
+    def test_networks(self) -> None:
+        with load():
+            networks = readenv.networks("NETWORKS_ENV")
+            self.assertEqual(len(networks), 5)
+            for address in ("10.0.0.0", "10.255.255.255", "192.168.1.7", "192.168.1.9", "2001:db8::1"):
+                self.assertIn(address, networks)
+            for address in ("11.0.0.0", "192.168.1.6", "192.168.1.10", "::1", "not an address"):
+                self.assertNotIn(address, networks)
+            self.assertNotIn(42, networks)
+            self.assertIn(ipaddress.ip_address("10.2.3.4"), networks)
+            self.assertIn(ipaddress.ip_network("10.1.0.0/20"), networks)
+            self.assertIn(ipaddress.ip_network("192.168.1.7/32"), networks)
+            self.assertNotIn(ipaddress.ip_network("192.168.1.6/31"), networks)
+            self.assertEqual(readenv.networks("MISSING", ["127.0.0.1/8"]), readenv.Networks(["127.0.0.0/8"]))
+            self.assertRaises(ValueError, readenv.networks, "MISSING", "127.0.0.1/8", strict=True)
+            self.assertRaises(ValueError, readenv.networks, "INVALID_NETWORKS_ENV")
+
     def test_dict(self) -> None:
         with load():
             self.assertEqual(readenv.dict("DICT_ENV_1"), {})
@@ -0,0 +1,53 @@
+import os
+import unittest
+
+import readenv
+
+from .utils import TempDirTestCase
+
+
+class DiscoveryTestCase(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.root = os.path.realpath(self.tmpdir.name)
+        self.project = os.path.join(self.root, "project")
+        self.nested = os.path.join(self.project, "a", "b")
+        os.makedirs(self.nested)
+        self.write(".env", "")
+        self.write(".env.local", "")
+        self.write("project/.env", "")
+
+    def test_find(self) -> None:
+        discovery = readenv.Discovery()
+        self.assertEqual(
+            discovery.find([".env", ".env.local", ".missing"], start=self.nested),
+            {
+                ".env": os.path.join(self.project, ".env"),
+                ".env.local": os.path.join(self.root, ".env.local"),
+                ".missing": None,
+            },
+        )
+        self.assertEqual(discovery.find(["b/.env"], start=self.nested), {"b/.env": None})
+
+    def test_root(self) -> None:
+        discovery = readenv.Discovery(root=self.project)
+        self.assertEqual(
+            discovery.find([".env", ".env.local"], start=self.nested),
+            {".env": os.path.join(self.project, ".env"), ".env.local": None},
+        )
+
+    def test_markers(self) -> None:
+        os.mkdir(os.path.join(self.project, ".git"))
+        discovery = readenv.Discovery(markers=(".git",))
+        self.assertEqual(discovery.find([".env.local"], start=self.nested), {".env.local": None})
+
+    def test_memoized(self) -> None:
+        discovery = readenv.Discovery()
+        self.assertEqual(discovery.find([".env"], start=self.nested)[".env"], os.path.join(self.project, ".env"))
+        # a new file changes the directory mtime and invalidates its listing
+        self.write("project/a/b/.env", "")
+        self.assertEqual(discovery.find([".env"], start=self.nested)[".env"], os.path.join(self.nested, ".env"))
+
+
+if __name__ == "__main__":
+    unittest.main()
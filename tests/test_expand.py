@@ -0,0 +1,55 @@
+import unittest
+
+import readenv
+
+
+class ExpandTestCase(unittest.TestCase):
+    def test_expand(self) -> None:
+        env = readenv.Environ({"HOME": "/home/user", "EMPTY": ""})
+        self.assertEqual(
+            env.expand(
+                {
+                    "URL": "${SCHEME}://${HOST}:${PORT:-8000}/",
+                    "SCHEME": "https",
+                    "HOST": "${NAME}.example.com",
+                    "NAME": "app",
+                    "DATA": "${HOME}/data",
+                    "LEVEL": "${LEVEL:-info}",
+                    "FALLBACK": "${EMPTY:-${NAME}}",
+                    "MISSING": "[${MISSING_VAR}]",
+                    "UNTERMINATED": "${NAME",
+                }
+            ),
+            {
+                "URL": "https://app.example.com:8000/",
+                "SCHEME": "https",
+                "HOST": "app.example.com",
+                "NAME": "app",
+                "DATA": "/home/user/data",
+                "LEVEL": "info",
+                "FALLBACK": "app",
+                "MISSING": "[]",
+                "UNTERMINATED": "${NAME",
+            },
+        )
+
+    def test_environment_wins(self) -> None:
+        env = readenv.Environ({"NAME": "env", "PATH": "/bin"})
+        self.assertEqual(
+            env.expand({"NAME": "file", "GREETING": "hello ${NAME}", "PATH": "${PATH}:/opt/bin"}),
+            {"NAME": "file", "GREETING": "hello env", "PATH": "/bin:/opt/bin"},
+        )
+
+    def test_chain(self) -> None:
+        values = {f"VAR_{i}": f"${{VAR_{i + 1}}}" for i in range(5000)}
+        values["VAR_5000"] = "end"
+        self.assertEqual(readenv.Environ().expand(values)["VAR_0"], "end")
+
+    def test_cycle(self) -> None:
+        with self.assertRaises(readenv.ExpansionError) as cm:
+            readenv.Environ().expand({"A": "${B}", "B": "${C}", "C": "${A}"})
+        self.assertEqual(cm.exception.cycle, ["A", "B", "C", "A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+from typing import Dict
+import unittest
+
+import readenv
+
+# modules `import readenv.loads` must not pull in: they are only needed by some converters and features
+DEFERRED = (
+    "array",
+    "asyncio",
+    "base64",
+    "concurrent.futures",
+    "decimal",
+    "hashlib",
+    "importlib",
+    "ipaddress",
+    "json",
+    "multiprocessing",
+    "pathlib",
+    "struct",
+    "traceback",
+)
+
+
+def importtime(statement: str) -> Dict[str, int]:
+    """Cumulative import time, in microseconds, of each module imported by statement, as reported by -X importtime"""
+    env = {key: value for key, value in os.environ.items() if not key.startswith("READENV_")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    modules: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:"):
+            _, cumulative, name = line[len("import time:") :].split("|")
+            # skip the header
+            if cumulative.strip().isdigit():
+                modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class ImportTestCase(unittest.TestCase):
+    def test_loads(self) -> None:
+        baseline = importtime("import typing")
+        modules = importtime("import readenv.loads")
+        self.assertIn("readenv._environ", modules)
+        imported = sorted(
+            module
+            for module in modules
+            if module not in baseline and any(module == name or module.startswith(f"{name}.") for name in DEFERRED)
+        )
+        self.assertEqual(imported, [], f"import readenv.loads took {modules['readenv.loads']} us")
+
+    def test_lazy_attributes(self) -> None:
+        statement = (
+            "import sys, readenv\n"
+            "assert 'readenv._bulk' not in sys.modules\n"
+            "assert readenv.load_many is readenv._bulk.load_many\n"
+            "assert 'concurrent.futures' in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        with self.assertRaises(AttributeError):
+            readenv.missing  # noqa: B018
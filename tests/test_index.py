@@ -0,0 +1,66 @@
+import unittest
+
+import readenv
+
+from .utils import TempDirTestCase
+
+
+class IndexTestCase(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.env = readenv.Environ(
+            {"DB_HOST": "db", "CACHE_URL": "redis://", "DB_PORT": "5432"}, index=readenv.KeyIndex()
+        )
+
+    def test_keys(self) -> None:
+        self.assertEqual(self.env.keys("DB_"), ["DB_HOST", "DB_PORT"])
+        self.assertEqual(self.env.keys(), ["CACHE_URL", "DB_HOST", "DB_PORT"])
+        self.assertEqual(self.env.keys("TENANT_"), [])
+        self.assertEqual(readenv.Environ({"DB_HOST": "db", "DBX": "1"}).keys("DB_"), ["DB_HOST"])
+
+    def test_writes(self) -> None:
+        self.assertEqual(self.env.keys("DB_"), ["DB_HOST", "DB_PORT"])
+        self.env.set("DB_NAME", "app")
+        self.env.setdefault("DB_USER", "app")
+        filename = self.write("db.env", "DB_A=1\nDB_B=2\nDB_HOST=other\n")
+        with self.env.transaction():
+            self.env.load(filename)
+            self.assertEqual(self.env.keys("DB_"), ["DB_A", "DB_B", "DB_HOST", "DB_NAME", "DB_PORT", "DB_USER"])
+        self.assertEqual(self.env.keys("DB_"), ["DB_HOST", "DB_NAME", "DB_PORT", "DB_USER"])
+        self.env._delete("DB_NAME")
+        self.assertEqual(self.env.keys("DB_"), ["DB_HOST", "DB_PORT", "DB_USER"])
+
+    def test_scope(self) -> None:
+        self.assertEqual(self.env.keys("DB_"), ["DB_HOST", "DB_PORT"])
+        with self.env.scope(DB_NAME="app"):
+            self.env.set("DB_USER", "app")
+            self.assertEqual(self.env.keys("DB_"), ["DB_HOST", "DB_NAME", "DB_PORT", "DB_USER"])
+        self.env.set("DB_TIMEOUT", "5")
+        self.assertEqual(self.env.keys("DB_"), ["DB_HOST", "DB_PORT", "DB_TIMEOUT"])
+
+
+class NamespaceTestCase(unittest.TestCase):
+    def test_namespace(self) -> None:
+        env = readenv.Environ({"DB_HOST": "db", "DB_PORT": "5432", "DEBUG": "1"}, index=readenv.KeyIndex())
+        db = env.namespace("DB_")
+        self.assertEqual(dict(db.environ), {"HOST": "db", "PORT": "5432"})
+        self.assertEqual(db.int("PORT"), 5432)
+        self.assertEqual(db.str("NAME", "app"), "app")
+        self.assertNotIn("DEBUG", db.environ)
+        # live, both ways
+        env.set("DB_PORT", 6432)
+        self.assertEqual(db.int("PORT"), 6432)
+        db.set("NAME", "app")
+        self.assertEqual(env.str("DB_NAME"), "app")
+        self.assertEqual(env.keys("DB_"), ["DB_HOST", "DB_NAME", "DB_PORT"])
+        self.assertEqual(db.namespace("NA").keys(), ["ME"])
+
+    def test_config(self) -> None:
+        class DatabaseConfig(readenv.Config):
+            port = readenv.Field(int, key="PORT")
+
+        env = readenv.Environ({"DB_PORT": "5432"})
+        config = DatabaseConfig(env.namespace("DB_"))
+        self.assertEqual(config.port, 5432)
+        env.set("DB_PORT", "6432")
+        self.assertEqual(config.port, 6432)
@@ -0,0 +1,106 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+import unittest
+import unittest.mock
+
+import readenv
+from readenv.__main__ import main
+
+from .utils import TempDirTestCase
+
+
+class MainTestCase(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.filename = self.write("app.env", "HOST=localhost\nURL=http://${HOST}/\nMESSAGE='one\ntwo'\nQUOTE=it's\n")
+
+    def run_main(self, *argv: str) -> Tuple[int, str, str]:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            result = main(list(argv))
+        return result, stdout.getvalue(), stderr.getvalue()
+
+    def test_dump(self) -> None:
+        result, output, _ = self.run_main("dump", "-f", self.filename)
+        self.assertEqual(result, 0)
+        self.assertEqual(output, "HOST=localhost\nURL=http://localhost/\nMESSAGE='one\ntwo'\nQUOTE=it's\n")
+
+    def test_dump_json(self) -> None:
+        _, output, _ = self.run_main("dump", "-f", self.filename, "--format", "json")
+        self.assertEqual(
+            json.loads(output),
+            {"HOST": "localhost", "URL": "http://localhost/", "MESSAGE": "one\ntwo", "QUOTE": "it's"},
+        )
+
+    def test_dump_shell(self) -> None:
+        _, output, _ = self.run_main("dump", "-f", self.filename, "--format", "shell")
+        self.assertIn("export URL=http://localhost/\n", output)
+        self.assertIn("export QUOTE='it'\"'\"'s'\n", output)
+
+    def test_dump_round_trip(self) -> None:
+        values = {"V": "'x'", "B": "'a\\b", "M": "line 1\nline 2\n"}
+        # values with quotes and newlines, expanded from the environment
+        self.write("app.env", "".join(f"{key}=${{DUMP_{key}}}\n" for key in values))
+        with unittest.mock.patch.dict(os.environ, {f"DUMP_{key}": value for key, value in values.items()}):
+            _, output, _ = self.run_main("dump", "-f", self.filename)
+        self.write("app.env", output)
+        self.assertEqual(dict(readenv.Environ({}).parse(self.filename)), values)
+        self.write("app.env", "W=${DUMP_W}\n")
+        for value in ("a'\nb", "a\nX='b\nc"):
+            with unittest.mock.patch.dict(os.environ, {"DUMP_W": value}):
+                result, _, errors = self.run_main("dump", "-f", self.filename)
+            self.assertEqual(result, 1)
+            self.assertIn("W: the value cannot be written in the env format", errors)
+
+    def test_check(self) -> None:
+        self.assertEqual(self.run_main("check", "-f", self.filename), (0, "4 variable(s) ok\n", ""))
+        # .env.local is optional
+        os.rename(self.filename, os.path.join(self.tmpdir.name, ".env"))
+        self.chdir()
+        self.assertEqual(self.run_main("check"), (0, "4 variable(s) ok\n", ""))
+
+    def test_check_errors(self) -> None:
+        self.write("app.env", "A=${B}\nnot a line\nB=${A}\nBAD-KEY=1\n")
+        result, _, errors = self.run_main("check", "-f", self.filename, "-f", "missing.env")
+        self.assertEqual(result, 1)
+        lines: List[str] = errors.splitlines()
+        self.assertEqual(
+            lines,
+            [
+                f"{self.filename}: Expecting KEY=VALUE: line 2 column 11",
+                f"{self.filename}: Expecting KEY=VALUE: line 4 column 4",
+                "missing.env: not found",
+                "Circular reference: A -> B -> A",
+            ],
+        )
+
+    def test_bench(self) -> None:
+        result, output, _ = self.run_main("bench", "-f", self.filename, "-n", "2")
+        self.assertEqual(result, 0)
+        self.assertIn("discovery (warm)", output)
+        self.assertIn(f"parse {self.filename}", output)
+
+    @unittest.skipIf(sys.platform == "win32", "exec is tested on posix only")
+    def test_exec(self) -> None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = {**os.environ, "PYTHONPATH": root, "HOST": "example.com"}
+        env.pop("URL", None)
+        code = "import os; print(os.environ['HOST'], os.environ['URL'])"
+        output = subprocess.run(
+            [sys.executable, "-m", "readenv", "exec", "-f", self.filename, "--", sys.executable, "-c", code],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        self.assertEqual(output, "example.com http://example.com/\n")
+
+    def test_exec_missing_command(self) -> None:
+        result, _, errors = self.run_main("exec", "-f", self.filename)
+        self.assertEqual(result, 2)
+        self.assertIn("missing command", errors)
@@ -0,0 +1,50 @@
+import unittest
+import unittest.mock
+
+from mypy.options import Options
+from mypy.plugin import ReportConfigContext
+
+import readenv
+from readenv import mypy as plugin
+
+from .utils import TempDirTestCase
+
+
+class PluginTestCase(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.filename = self.write("app.env", "A=1\n")
+        self.env = readenv.Environ({})
+        self.loaded = plugin.Loaded(self.env, self.filename)
+
+    def test_refresh(self) -> None:
+        digest = self.loaded.refresh()
+        self.assertEqual(self.env.environ, {"A": "1"})
+        self.assertEqual(self.loaded.refresh(), digest)
+        self.write("app.env", "A=22\n")
+        self.assertNotEqual(self.loaded.refresh(), digest)
+        # reloaded in place, as within a dmypy daemon
+        self.assertEqual(self.env.environ, {"A": "22"})
+
+    def test_vanished(self) -> None:
+        digest = self.loaded.refresh()
+        with unittest.mock.patch.object(self.loaded, "_stat", side_effect=FileNotFoundError):
+            self.assertEqual(self.loaded.refresh(), "")
+        self.assertEqual(self.loaded.refresh(), digest)
+
+    def test_report_config_data(self) -> None:
+        loaded, plugin._loaded = plugin._loaded, self.loaded
+        try:
+            instance = plugin.plugin("1.0")(Options())
+            self.assertEqual(self.env.environ, {"A": "1"})
+            ctx = ReportConfigContext(id="app", path="app.py", is_check=False)
+            digest = instance.report_config_data(ctx)
+            self.assertEqual(digest, self.loaded.digest)
+            # the same for every module of a build, computed once
+            self.write("app.env", "A=22\n")
+            with unittest.mock.patch.object(self.loaded, "refresh") as refresh:
+                self.assertEqual(instance.report_config_data(ctx), digest)
+            refresh.assert_not_called()
+            self.assertNotEqual(plugin.plugin("1.0")(Options()).report_config_data(ctx), digest)
+        finally:
+            plugin._loaded = loaded
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import threading
+from typing import Dict, List
+import unittest
+
+import readenv
+
+
+class OverlayTestCase(unittest.TestCase):
+    def test_copy_on_write(self) -> None:
+        parent = {"A": "1", "B": "2"}
+        overlay = readenv.Overlay(parent)
+        overlay["A"] = "10"
+        overlay["C"] = "3"
+        del overlay["B"]
+        self.assertEqual(dict(overlay), {"A": "10", "C": "3"})
+        self.assertEqual(len(overlay), 2)
+        self.assertNotIn("B", overlay)
+        self.assertEqual(parent, {"A": "1", "B": "2"})
+        with self.assertRaises(KeyError):
+            del overlay["B"]
+        overlay["B"] = "20"
+        self.assertEqual(overlay["B"], "20")
+
+    def test_fork(self) -> None:
+        env = readenv.Environ({"A": "1"})
+        fork = env.fork()
+        fork.set("A", 2)
+        fork.set("B", 3)
+        self.assertEqual((fork.int("A"), fork.int("B")), (2, 3))
+        self.assertEqual(env.environ, {"A": "1"})
+        # the parent is not copied: its later writes show through
+        env.set("C", 4)
+        self.assertEqual(fork.int("C"), 4)
+
+
+class ScopeTestCase(unittest.TestCase):
+    def test_nested(self) -> None:
+        base = {"A": "1"}
+        env = readenv.Environ(base)
+        with env.scope(A=2, B="x"):
+            self.assertEqual(env.int("A"), 2)
+            with env.scope({"A": "3"}):
+                env.set("C", "c")
+                self.assertEqual((env.int("A"), env.str("B"), env.str("C")), (3, "x", "c"))
+            self.assertEqual(env.int("A"), 2)
+            self.assertNotIn("C", env.environ)
+        self.assertEqual(env.int("A"), 1)
+        self.assertEqual(base, {"A": "1"})
+        # once the last scope is closed, lookups go straight to the underlying mapping
+        self.assertIs(env.environ, base)
+
+    def test_os_environ_untouched(self) -> None:
+        key = "__ENV_FOR_READENV_SCOPE_TEST_CASE__"
+        env = readenv.Environ(os.environ)
+        with env.scope({key: "1"}):
+            self.assertTrue(env.bool(key))
+            self.assertNotIn(key, os.environ)
+        self.assertIs(env.environ, os.environ)
+
+    def test_threads(self) -> None:
+        env = readenv.Environ({"N": "-1"})
+        barrier = threading.Barrier(4)
+        seen: Dict[int, int] = {}
+
+        def worker(n: int) -> None:
+            with env.scope(N=n):
+                barrier.wait()
+                seen[n] = env.int("N")
+
+        threads: List[threading.Thread] = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(seen, {0: 0, 1: 1, 2: 2, 3: 3})
+        self.assertEqual(env.int("N"), -1)
+        self.assertIsInstance(env.environ, dict)
+
+    def test_tasks(self) -> None:
+        env = readenv.Environ({})
+
+        async def task(n: int) -> int:
+            with env.scope(N=n):
+                await asyncio.sleep(0)
+                value: int = env.int("N")
+                return value
+
+        async def main() -> List[int]:
+            return list(await asyncio.gather(*(task(n) for n in range(4))))
+
+        self.assertEqual(asyncio.run(main()), [0, 1, 2, 3])
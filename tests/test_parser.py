@@ -0,0 +1,90 @@
+from typing import Iterator, List
+import unittest
+
+import readenv
+from readenv._parser import parse
+
+
+class ParseTestCase(unittest.TestCase):
+    def test_parse(self) -> None:
+        lines = [
+            "# a comment",
+            "",
+            "KEY=value",
+            "export EXPORTED=1",
+            "export=2",
+            "EMPTY=",
+            "QUOTED='quoted value'",
+            "ESCAPED=''it\\'s''",
+            "SPACES=a b ",
+            "not a valid line",
+        ]
+        self.assertEqual(
+            list(parse(lines)),
+            [
+                ("KEY", "value"),
+                ("EXPORTED", "1"),
+                ("export", "2"),
+                ("EMPTY", ""),
+                ("QUOTED", "quoted value"),
+                ("ESCAPED", "it's"),
+                ("SPACES", "a b "),
+            ],
+        )
+
+    def test_multiline(self) -> None:
+        lines = ["FIRST='line 1\n", "line 2\n", "line 3'\n", "SECOND=2\n"]
+        self.assertEqual(list(parse(lines)), [("FIRST", "line 1\nline 2\nline 3"), ("SECOND", "2")])
+
+    def test_unterminated(self) -> None:
+        self.assertEqual(
+            list(parse(["A='foo", "B=bar", "C='baz'"])),
+            [("A", "'foo"), ("B", "bar"), ("C", "baz")],
+        )
+        self.assertEqual(list(parse(["X='oops", "Y=1"])), [("X", "'oops"), ("Y", "1")])
+        with self.assertRaises(readenv.ParseError) as cm:
+            list(parse(["A=1", "KEY='line 1", "line 2"], filename=".env", strict=True))
+        self.assertEqual((cm.exception.lineno, cm.exception.colno), (2, 5))
+        self.assertEqual(str(cm.exception), ".env: Unterminated quoted value: line 2 column 5")
+        errors: List[readenv.ParseError] = []
+        self.assertEqual(
+            list(parse(["KEY='line 1", "B-C=2", "D=3"], strict=True, errors=errors)),
+            [("KEY", "'line 1"), ("D", "3")],
+        )
+        self.assertEqual(
+            [(error.msg, error.lineno) for error in errors],
+            [("Unterminated quoted value", 1), ("Expecting KEY=VALUE", 2)],
+        )
+
+    def test_many_unterminated(self) -> None:
+        read: List[int] = []
+
+        def lines() -> Iterator[str]:
+            for i in range(20000):
+                read.append(i)
+                yield f"K{i}='v{i}"
+
+        pairs = parse(lines())
+        self.assertEqual(next(pairs), ("K0", "'v0"))
+        # the lookahead ends at the next KEY='... line, not at the end of the file
+        self.assertEqual(len(read), 2)
+        self.assertEqual(list(pairs)[-1], ("K19999", "'v19999"))
+        self.assertEqual(list(parse(["A='x", "B='y", "z'"])), [("A", "'x"), ("B", "y\nz")])
+
+    def test_strict(self) -> None:
+        self.assertEqual(list(parse(["# comment", "", "A=1"], strict=True)), [("A", "1")])
+        with self.assertRaises(readenv.ParseError) as cm:
+            list(parse(["A=1", "B-C=2"], strict=True))
+        self.assertEqual((cm.exception.lineno, cm.exception.colno), (2, 2))
+
+    def test_generator(self) -> None:
+        env = readenv.Environ()
+        pairs = env.parse("tests/test.env")
+        self.assertEqual(next(pairs), ("INT_ENV", "1"))
+        self.assertEqual(env.environ, {})
+        self.assertIn(("__ENV_FOR_READENV_TEST_CASE__", "1"), list(pairs))
+        self.assertEqual(env.environ, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
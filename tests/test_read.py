@@ -2,7 +2,7 @@ import unittest
 
 import readenv
 
-from .utils import load
+from .utils import load, TempDirTestCase
 
 
 class LoadTestCase(unittest.TestCase):
@@ -13,5 +13,28 @@ class LoadTestCase(unittest.TestCase):
         self.assertRaises(KeyError, readenv.bool, "__ENV_FOR_READENV_TEST_CASE__")
 
 
+class ApplyTestCase(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.filename = self.write(".env", "A=1\nB=2\nC=3\n")
+
+    def test_setdefault(self) -> None:
+        env = readenv.Environ({"A": "0", "B": "2"})
+        self.assertEqual(env.load(self.filename), readenv.Applied(written=1, skipped=2))
+        self.assertEqual(env.environ, {"A": "0", "B": "2", "C": "3"})
+
+    def test_override(self) -> None:
+        cache = readenv.CastCache()
+        env = readenv.Environ({"A": "0", "B": "2"}, cast_cache=cache)
+        self.assertEqual(env.int("A"), 0)
+        # B already has the loaded value, so it isn't written again
+        self.assertEqual(env.load(self.filename, override=True), readenv.Applied(written=2, skipped=1))
+        self.assertEqual(env.environ, {"A": "1", "B": "2", "C": "3"})
+        self.assertEqual(env.int("A"), 1)
+        # overridden values belong to load(), and are updated by reload()
+        self.write(".env", "A=10\n")
+        self.assertEqual(env.reload().changed, frozenset({"A"}))
+
+
 if __name__ == "__main__":
     unittest.main()
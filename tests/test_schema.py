@@ -0,0 +1,115 @@
+import asyncio
+from typing import List
+import unittest
+
+import readenv
+
+
+class SchemaTestCase(unittest.TestCase):
+    schema = readenv.Schema(
+        "Config",
+        debug=readenv.Field(bool, False, key="DEBUG"),
+        port=readenv.Field(int, key="PORT"),
+        hosts=readenv.Field(list, "localhost", key="HOSTS"),
+        name=readenv.Field(key="NAME"),
+    )
+
+    def test_resolve(self) -> None:
+        settings = readenv.Environ({"DEBUG": "yes", "PORT": "8000", "NAME": "app"}).resolve(self.schema)
+        self.assertEqual(
+            (settings.debug, settings.port, settings.hosts, settings.name), (True, 8000, ["localhost"], "app")
+        )
+        self.assertEqual(repr(settings), "Config(debug=True, port=8000, hosts=['localhost'], name='app')")
+        self.assertFalse(hasattr(settings, "__dict__"))
+        with self.assertRaises(AttributeError):
+            settings.port = 80
+
+    def test_reuse(self) -> None:
+        first = readenv.Environ({"PORT": "1", "NAME": "a"}).resolve(self.schema)
+        second = readenv.Environ({"PORT": "2", "NAME": "b"}).resolve(self.schema)
+        self.assertIs(type(first), type(second))
+        self.assertEqual((first.port, second.port), (1, 2))
+
+    def test_errors(self) -> None:
+        with self.assertRaises(readenv.SchemaError) as cm:
+            readenv.Environ({"DEBUG": "maybe", "PORT": "http"}).resolve(self.schema)
+        self.assertEqual(list(cm.exception.errors), ["DEBUG", "PORT", "NAME"])
+        self.assertIsInstance(cm.exception.errors["NAME"], KeyError)
+
+
+class AppConfig(readenv.Config):
+    debug = readenv.Field(bool, False, key="DEBUG")
+    port = readenv.Field(int, key="PORT")
+
+
+class WorkerConfig(AppConfig):
+    workers = readenv.Field(int, 4, key="WORKERS")
+
+
+class ConfigTestCase(unittest.TestCase):
+    def test_cached(self) -> None:
+        env = readenv.Environ({"PORT": "8000"})
+        config = AppConfig(env)
+        self.assertEqual((config.debug, config.port), (False, 8000))
+        # cached in the instance dict: the descriptor is not reached anymore
+        self.assertEqual(vars(config)["port"], 8000)
+        env.environ["PORT"] = "1"
+        self.assertEqual(config.port, 8000)
+        self.assertEqual(repr(config), "AppConfig(debug=False, port=8000)")
+
+    def test_invalidation(self) -> None:
+        env = readenv.Environ({"PORT": "8000"})
+        config = WorkerConfig(env)
+        self.assertEqual((config.port, config.workers), (8000, 4))
+        env.set("PORT", 9000)
+        self.assertNotIn("port", vars(config))
+        self.assertEqual(config.port, 9000)
+        with env.transaction():
+            env.setdefault("WORKERS", 8)
+            self.assertEqual(config.workers, 8)
+        self.assertEqual(config.workers, 4)
+        with env.scope(DEBUG="yes"):
+            self.assertTrue(config.debug)
+        self.assertFalse(config.debug)
+
+    def test_scope_tasks(self) -> None:
+        class LogConfig(readenv.Config):
+            level = readenv.Field(key="LEVEL")
+
+        env = readenv.Environ({"LEVEL": "info"})
+        config = LogConfig(env)
+        entered = asyncio.Event()
+        read = asyncio.Event()
+
+        async def scoped() -> str:
+            with env.scope(LEVEL="debug"):
+                level: str = config.level
+                entered.set()
+                await read.wait()
+                again: str = config.level
+                return f"{level}/{again}"
+
+        async def outside() -> str:
+            await entered.wait()
+            level: str = config.level
+            read.set()
+            return level
+
+        async def main() -> List[str]:
+            return list(await asyncio.gather(scoped(), outside()))
+
+        self.assertEqual(asyncio.run(main()), ["debug/debug", "info"])
+        self.assertEqual(config.level, "info")
+        self.assertIn("level", vars(config))
+
+    def test_errors(self) -> None:
+        config = AppConfig(readenv.Environ({"PORT": "http"}))
+        with self.assertRaises(ValueError):
+            config.port
+        with self.assertRaises(KeyError):
+            AppConfig(readenv.Environ({})).port
+        self.assertIsInstance(AppConfig.port, readenv.Field)
+
+
+if __name__ == "__main__":
+    unittest.main()
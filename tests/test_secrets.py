@@ -0,0 +1,53 @@
+import os
+
+import readenv
+
+from .utils import TempDirTestCase
+
+
+class SecretsTestCase(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.environ = {}
+        for key, value in (("PASSWORD", "s3cret\n"), ("PORT", "5432"), ("TOKEN", "abc")):
+            self.environ[f"{key}_FILE"] = self.write(key.lower(), value)
+        self.secrets = readenv.SecretCache()
+        self.env = readenv.Environ(self.environ, secrets=self.secrets)
+
+    def test_get(self) -> None:
+        self.assertEqual(self.env.str("PASSWORD"), "s3cret")
+        self.assertEqual(self.env.int("PORT"), 5432)
+        self.assertEqual(self.env.str("MISSING", "default"), "default")
+        self.assertEqual(self.env.str("PASSWORD"), "s3cret")
+        self.assertEqual(self.secrets.stats(), {"hits": 1, "misses": 2, "size": 2})
+        # the environment wins
+        self.env.set("PASSWORD", "plain")
+        self.assertEqual(self.env.str("PASSWORD"), "plain")
+        self.assertEqual(readenv.Environ(self.environ).str("TOKEN", "none"), "none")
+
+    def test_rotation(self) -> None:
+        self.assertEqual(self.env.str("TOKEN"), "abc")
+        self.write("token", "rotated")
+        self.assertEqual(self.env.str("TOKEN"), "rotated")
+
+    def test_missing_file(self) -> None:
+        os.unlink(self.environ["TOKEN_FILE"])
+        with self.assertRaises(FileNotFoundError):
+            self.env.str("TOKEN", "default")
+
+    def test_prefetch(self) -> None:
+        self.env.set("TOKEN", "plain")
+        self.assertEqual(sorted(self.env.prefetch()), ["PASSWORD", "PORT"])
+        self.assertEqual(self.secrets.stats()["misses"], 2)
+        self.assertEqual(self.env.str("PASSWORD"), "s3cret")
+        self.assertEqual(self.secrets.stats()["hits"], 1)
+        self.assertEqual(readenv.Environ(self.environ).prefetch(), [])
+
+    def test_schema(self) -> None:
+        schema = readenv.Schema(password=readenv.Field(key="PASSWORD"), port=readenv.Field(int, key="PORT"))
+        settings = self.env.resolve(schema)
+        self.assertEqual((settings.password, settings.port), ("s3cret", 5432))
+
+    def test_namespace(self) -> None:
+        env = readenv.Environ({"DB_PASSWORD_FILE": self.environ["PASSWORD_FILE"]}, secrets=self.secrets)
+        self.assertEqual(env.namespace("DB_").str("PASSWORD"), "s3cret")
@@ -0,0 +1,140 @@
+import json
+from multiprocessing.shared_memory import SharedMemory
+import os
+import pickle
+import subprocess
+import sys
+import unittest
+
+import readenv
+from readenv._shared import _HEADER, _MAGIC, _VERSION
+
+from .utils import TempDirTestCase
+
+
+def upper(value: str) -> str:
+    return value.upper()
+
+
+@unittest.skipIf(sys.platform == "win32", "forks and spawns are tested on posix only")
+class SharedTestCase(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.filename = self.write("app.env", 'CONFIG={"workers": 4, "hosts": ["a", "b"]}\nPORTS=80,443\n')
+        self.env = readenv.Environ({}, cast_cache=readenv.CastCache())
+        self.env.load(self.filename)
+        self.env.json("CONFIG")
+        self.env.list("PORTS", cast=int)
+        # not picklable: left out
+        self.env.get("PORTS", cast=lambda value: value)
+        # not a readenv converter, a worker may not be able to import it: left out
+        self.env.get("PORTS", cast=upper)
+        self.shm = readenv.publish(self.env)
+
+    def tearDown(self) -> None:
+        os.environ.pop("READENV_SHM", None)
+        self.shm.close()
+        self.shm.unlink()
+
+    def test_attach(self) -> None:
+        self.assertEqual(os.environ["READENV_SHM"], self.shm.name)
+        env = readenv.Environ({"PORTS": "8080"})
+        self.assertEqual(readenv.attach(self.shm.name, env), readenv.Applied(written=1, skipped=1))
+        assert env.cast_cache is not None
+        self.assertEqual(len(env.cast_cache), 2)
+        self.assertEqual(env.json("CONFIG"), {"workers": 4, "hosts": ("a", "b")})
+        # the published PORTS value doesn't match this environment one: converted again
+        self.assertEqual(env.list("PORTS", cast=int), (8080,))
+        self.assertEqual(env.cast_cache.stats()["hits"], 1)
+        # the filenames are published too, so the values can be reloaded
+        self.assertFalse(env.reload())
+
+    def test_worker(self) -> None:
+        # a spawned worker: readenv.loads attaches instead of loading
+        statement = (
+            "import json, readenv.loads, readenv\n"
+            "print(json.dumps([dict(readenv.json('CONFIG')), readenv.environ.cast_cache.stats()]))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", statement],
+            capture_output=True,
+            check=True,
+            cwd=self.tmpdir.name,
+            env={**os.environ, "PYTHONPATH": os.path.dirname(os.path.dirname(readenv.__file__))},
+            text=True,
+        )
+        config, stats = json.loads(result.stdout)
+        self.assertEqual(config, {"workers": 4, "hosts": ["a", "b"]})
+        self.assertEqual(stats["hits"], 1)
+
+    def test_other_files(self) -> None:
+        # a master loading its .env, and another project started from it, with its own .env
+        for name in ("master", "other"):
+            self.write(os.path.join(name, ".env"), f"WHO={name}\n")
+        self.chdir("master")
+        env = readenv.Environ({}, discovery=readenv.Discovery(root=self.tmpdir.name))
+        env.load()
+        shm = readenv.publish(env)
+        self.addCleanup(shm.unlink)
+        self.addCleanup(shm.close)
+        statement = "import readenv.loads, os\nprint(os.environ['WHO'])\n"
+        result = subprocess.run(
+            [sys.executable, "-c", statement],
+            capture_output=True,
+            check=True,
+            cwd=os.path.join(self.tmpdir.name, "other"),
+            env={**os.environ, "PYTHONPATH": os.path.dirname(os.path.dirname(readenv.__file__))},
+            text=True,
+        )
+        self.assertEqual(result.stdout, "other\n")
+        # a published file changed since
+        self.write("app.env", 'CONFIG={"workers": 4, "hosts": ["a", "b"]}\nPORTS=80,443\nNEW=1\n')
+        with self.assertRaises(ValueError):
+            readenv.attach(self.shm.name, readenv.Environ({}))
+
+    def segment(self, payload: bytes) -> str:
+        shm = SharedMemory(create=True, size=_HEADER.size + len(payload))
+        self.addCleanup(shm.unlink)
+        self.addCleanup(shm.close)
+        assert shm.buf is not None
+        _HEADER.pack_into(shm.buf, 0, _MAGIC, _VERSION, len(payload))
+        shm.buf[_HEADER.size : _HEADER.size + len(payload)] = payload
+        return shm.name
+
+    def test_corrupt(self) -> None:
+        data = {"filenames": [self.filename], "sources": readenv._shared._sources(self.env, [self.filename])}
+        for payload in (
+            b"\x80",
+            pickle.dumps({**data, "values": {"A": "1"}}),
+            pickle.dumps({**data, "values": {"A": 1}, "casts": []}),
+        ):
+            env = readenv.Environ({})
+            with self.assertRaises(ValueError):
+                readenv.attach(self.segment(payload), env)
+            self.assertEqual(env.environ, {})
+        # a converter readenv doesn't publish is not imported, its value is converted again
+        casts = [pickle.dumps(("A", "a", upper, "A")), pickle.dumps(("A", "a", str, "a")), b"\x80"]
+        env = readenv.Environ({}, cast_cache=readenv.CastCache())
+        name = self.segment(pickle.dumps({**data, "values": {"A": "a"}, "casts": casts}))
+        self.assertEqual(readenv.attach(name, env), readenv.Applied(written=1, skipped=0))
+        assert env.cast_cache is not None
+        self.assertEqual(len(env.cast_cache), 1)
+        # a corrupt segment: the worker loads the env files
+        self.write(".env", "WHO=worker\n")
+        result = subprocess.run(
+            [sys.executable, "-c", "import readenv.loads, os\nprint(os.environ['WHO'])\n"],
+            capture_output=True,
+            check=True,
+            cwd=self.tmpdir.name,
+            env={
+                **os.environ,
+                "PYTHONPATH": os.path.dirname(os.path.dirname(readenv.__file__)),
+                "READENV_SHM": self.segment(b"\x80"),
+            },
+            text=True,
+        )
+        self.assertEqual(result.stdout, "worker\n")
+
+    def test_missing(self) -> None:
+        with self.assertRaises(OSError):
+            readenv.attach("readenv-missing-segment", readenv.Environ({}))
@@ -0,0 +1,101 @@
+import os
+
+import readenv
+from readenv._snapshot import Source
+
+from .utils import TempDirTestCase
+
+
+class SnapshotTestCase(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.filename = self.write(".env", "A=1\nB=${A}-${HOME}\n")
+        self.output = os.path.join(self.tmpdir.name, "env.snapshot")
+
+    def test_round_trip(self) -> None:
+        readenv.Environ({}).compile(self.output, self.filename)
+        snapshot = readenv.Snapshot.read(self.output)
+        self.assertEqual(snapshot.names, (self.filename,))
+        self.assertEqual(snapshot.values, {"A": "1", "B": "${A}-${HOME}"})
+        self.assertFalse(snapshot.expanded)
+        self.assertTrue(snapshot.fresh())
+        with self.assertRaises(readenv.SnapshotError):
+            readenv.Snapshot.loads(snapshot.dumps()[:-1])
+
+    def test_load(self) -> None:
+        readenv.Environ({}).compile(self.output, self.filename)
+        # the file is not read again: the snapshot values are expanded against the loading environment
+        env = readenv.Environ({"HOME": "/home/user"}, snapshot=self.output, parse_cache=readenv.ParseCache())
+        env.load(self.filename)
+        self.assertEqual(env.environ, {"HOME": "/home/user", "A": "1", "B": "1-/home/user"})
+        assert env.parse_cache is not None
+        self.assertEqual(env.parse_cache.stats()["misses"], 0)
+
+    def test_expanded(self) -> None:
+        readenv.Environ({"HOME": "/root"}).compile(self.output, self.filename, expand=True)
+        env = readenv.Environ({}, snapshot=self.output)
+        env.load(self.filename)
+        self.assertEqual(env.environ, {"A": "1", "B": "1-/root"})
+
+    def test_stale(self) -> None:
+        readenv.Environ({}).compile(self.output, self.filename)
+        self.write(".env", "A=22\n")
+        self.assertFalse(readenv.Snapshot.read(self.output).fresh())
+        env = readenv.Environ({}, snapshot=self.output)
+        env.load(self.filename)
+        self.assertEqual(env.environ, {"A": "22"})
+
+    def test_touched(self) -> None:
+        readenv.Environ({}).compile(self.output, self.filename)
+        os.utime(self.filename, ns=(0, 0))
+        # different mtime, same content
+        self.assertTrue(readenv.Snapshot.read(self.output).fresh())
+
+    def test_discovery(self) -> None:
+        for name in ("a", "b"):
+            self.write(os.path.join(name, ".env"), f"WHO={name}\n")
+        discovery = readenv.Discovery(root=self.tmpdir.name)
+        self.chdir("a")
+        readenv.Environ({}, discovery=discovery).compile(self.output)
+        env = readenv.Environ({}, snapshot=self.output, discovery=discovery)
+        env.load()
+        self.assertEqual(env.environ, {"WHO": "a"})
+        # a file created after compiling is found
+        self.write("a/.env.local", "LOCAL=1\n")
+        env = readenv.Environ({}, snapshot=self.output, discovery=discovery)
+        env.load()
+        self.assertEqual(env.environ, {"WHO": "a", "LOCAL": "1"})
+        # compiled in a/, not used in b/
+        self.chdir("b")
+        env = readenv.Environ({}, snapshot=self.output, discovery=discovery)
+        env.load()
+        self.assertEqual(env.environ, {"WHO": "b"})
+
+    def test_corrupt(self) -> None:
+        readenv.Environ({}).compile(self.output, self.filename)
+        data = readenv.Snapshot.read(self.output).dumps()
+        corrupts = (
+            # not utf-8
+            data[:-1] + b"\xff",
+            # not a number
+            readenv.Snapshot([], [Source("p", 1, 2)], {}, digest=b"").dumps().replace(b"\x001\x00", b"\x00x\x00"),
+            # a missing field
+            readenv.Snapshot([], [Source("p\0", 1, 2)], {}, digest=b"").dumps(),
+        )
+        for corrupt in corrupts:
+            with self.assertRaises(readenv.SnapshotError):
+                readenv.Snapshot.loads(corrupt)
+        with open(self.output, "wb") as f:
+            f.write(data[:-1] + b"\xff")
+        env = readenv.Environ({}, snapshot=self.output)
+        env.load(self.filename)
+        self.assertEqual(env.environ["A"], "1")
+
+    def test_other_filenames(self) -> None:
+        readenv.Environ({}).compile(self.output, self.filename)
+        other = os.path.join(self.tmpdir.name, "other.env")
+        with open(other, "w") as f:
+            f.write("C=3\n")
+        env = readenv.Environ({}, snapshot=self.output)
+        env.load(other)
+        self.assertEqual(env.environ, {"C": "3"})
@@ -0,0 +1,56 @@
+import os
+from typing import Any, List, Mapping, Tuple
+import unittest
+
+import readenv
+
+from .utils import TempDirTestCase
+
+
+class StatsTestCase(TempDirTestCase):
+    def test_disabled(self) -> None:
+        env = readenv.Environ()
+        self.assertIsNone(env.stats)
+        self.assertNotIn("get", vars(env))
+
+    def test_instrument(self) -> None:
+        events: List[Tuple[str, Mapping[str, Any]]] = []
+        env = readenv.Environ(parse_cache=readenv.ParseCache(), cast_cache=readenv.CastCache())
+        stats = env.instrument(lambda event, data: events.append((event, data)))
+        path = self.write(".env", "PORT=8000\nDEBUG=yes\n")
+        env.load(path, os.path.join(self.tmpdir.name, "missing.env"))
+        env.load(path)
+        self.assertEqual([event for event, _ in events], ["discovery", "file", "load", "discovery", "file", "load"])
+        for _ in range(3):
+            env.int("PORT")
+        env.bool("DEBUG")
+        env.str("DEBUG")
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["access"], {"PORT": 3, "DEBUG": 2})
+        self.assertEqual(snapshot["casts"]["int"]["count"], 3)
+        self.assertEqual(snapshot["casts"]["_cast_bool"]["count"], 1)
+        self.assertEqual(snapshot["files"][path]["keys"], 2)
+        self.assertTrue(snapshot["files"][path]["cached"])
+        self.assertEqual(len(snapshot["loads"]), 2)
+        self.assertEqual(snapshot["caches"]["parse_cache"]["hits"], 1)
+        self.assertEqual(snapshot["caches"]["cast_cache"]["hits"], 2)
+        env.uninstrument()
+        env.int("PORT")
+        self.assertIsNone(env.stats)
+        self.assertEqual(stats.access["PORT"], 3)
+
+    def test_module_get(self) -> None:
+        stats = readenv.environ.instrument()
+        self.addCleanup(readenv.environ.uninstrument)
+        with readenv.environ.transaction():
+            readenv.set("READENV_STATS_X", "1")
+            readenv.get("READENV_STATS_X")
+            readenv.int("READENV_STATS_X")
+        self.assertEqual(stats.access["READENV_STATS_X"], 2)
+        # the plain bound method again, costing nothing extra
+        readenv.environ.uninstrument()
+        self.assertIs(readenv.get.__func__, readenv.Environ.get)  # type: ignore[attr-defined]
+
+
+if __name__ == "__main__":
+    unittest.main()
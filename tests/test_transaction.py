@@ -0,0 +1,93 @@
+import asyncio
+from typing import Any, Dict, Iterator
+
+import readenv
+
+from .utils import TempDirTestCase
+
+
+class RecordingDict(Dict[str, Any]):
+    """Count the writes, to check that a rollback touches only the keys written"""
+
+    writes: int = 0
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.writes += 1
+        super().__setitem__(key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        raise AssertionError("the environment should not be walked")
+
+
+class TransactionTestCase(TempDirTestCase):
+    def test_rollback(self) -> None:
+        environ = RecordingDict({f"K{i}": str(i) for i in range(100)})
+        env = readenv.Environ(environ)
+        with env.transaction():
+            env.set("K1", "x")
+            env.set("K1", "y")
+            env.setdefault("K2", "x")
+            env.setdefault("NEW", "1")
+            env._delete("K3")
+        self.assertEqual(len(environ), 100)
+        self.assertEqual((environ["K1"], environ["K2"], environ["K3"]), ("1", "2", "3"))
+        self.assertNotIn("NEW", environ)
+        # 2 sets, then K1 and K3 restored
+        self.assertEqual(environ.writes, 4)
+
+    def test_load(self) -> None:
+        filename = self.write(".env", "A=1\nB=2\n")
+        env = readenv.Environ({"B": "0"})
+        with env.transaction():
+            env.load(filename, override=True)
+            self.assertEqual(env.environ, {"A": "1", "B": "2"})
+        self.assertEqual(env.environ, {"B": "0"})
+        self.assertEqual(env._loaded, {})
+
+    def test_nested(self) -> None:
+        env = readenv.Environ({"A": "1"})
+        with env.transaction():
+            env.set("A", "2")
+            with env.transaction(commit=True):
+                env.set("A", "3")
+                env.set("B", "3")
+            self.assertEqual(env.environ, {"A": "3", "B": "3"})
+            with env.transaction():
+                env.set("A", "4")
+            self.assertEqual(env.environ, {"A": "3", "B": "3"})
+        self.assertEqual(env.environ, {"A": "1"})
+
+    def test_commit(self) -> None:
+        env = readenv.Environ({"A": "1"})
+        with env.transaction(commit=True):
+            env.set("A", "2")
+        self.assertEqual(env.environ, {"A": "2"})
+        with self.assertRaises(RuntimeError):
+            with env.transaction(commit=True):
+                env.set("A", "3")
+                raise RuntimeError
+        self.assertEqual(env.environ, {"A": "2"})
+
+    def test_concurrent(self) -> None:
+        env = readenv.Environ({"A": "1", "B": "1"})
+
+        async def first(opened: asyncio.Event, closed: asyncio.Event) -> None:
+            with env.transaction():
+                env.set("A", "2")
+                await opened.wait()
+            closed.set()
+
+        async def second(opened: asyncio.Event, closed: asyncio.Event) -> None:
+            with env.transaction():
+                opened.set()
+                await closed.wait()
+                # the first transaction is gone: this write is still recorded in this one
+                env.set("B", "2")
+                self.assertEqual(env.environ, {"A": "1", "B": "2"})
+
+        async def main() -> None:
+            opened, closed = asyncio.Event(), asyncio.Event()
+            await asyncio.gather(first(opened, closed), second(opened, closed))
+
+        asyncio.run(main())
+        self.assertEqual(env.environ, {"A": "1", "B": "1"})
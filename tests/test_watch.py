@@ -0,0 +1,56 @@
+import os
+import threading
+from typing import List
+
+import readenv
+
+from .utils import TempDirTestCase
+
+
+class WatcherTestCase(TempDirTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.base = self.write("base.env", "A=1\nB=2\n")
+        self.local = self.write("local.env", "C=3\n")
+        self.env = readenv.Environ({"B": "0"})
+        self.env.load(self.base, self.local)
+
+    def write(self, filename: str, content: str, *, mtime_ns: int = 0) -> str:
+        path = super().write(filename, content)
+        if mtime_ns:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def test_check(self) -> None:
+        watcher = self.env.watch(start=False)
+        self.assertIsNone(watcher.check())
+        self.write("base.env", "A=10\nB=20\nD=4\n", mtime_ns=10**9)
+        os.remove(self.local)
+        changes = watcher.check()
+        self.assertEqual(changes, readenv.Changes(frozenset({"D"}), frozenset({"A"}), frozenset({"C"})))
+        # B was not set by load
+        self.assertEqual(self.env.environ, {"A": "10", "B": "0", "D": "4"})
+        self.assertIsNone(watcher.check())
+
+    def test_only_modified_files_are_parsed(self) -> None:
+        cache = readenv.ParseCache()
+        self.env.parse_cache = cache
+        watcher = self.env.watch(start=False)
+        misses = cache.misses
+        self.write("local.env", "C=30\n", mtime_ns=10**9)
+        watcher.check()
+        self.assertEqual(cache.misses, misses + 1)
+        self.assertEqual(self.env.environ["C"], "30")
+
+    def test_thread(self) -> None:
+        called = threading.Event()
+        seen: List[readenv.Changes] = []
+
+        def callback(changes: readenv.Changes) -> None:
+            seen.append(changes)
+            called.set()
+
+        with self.env.watch(callback, interval=0.01):
+            self.write("local.env", "C=3\nE=5\n", mtime_ns=10**9)
+            self.assertTrue(called.wait(5))
+        self.assertEqual(seen, [readenv.Changes(frozenset({"E"}), frozenset(), frozenset())])
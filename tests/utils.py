@@ -1,17 +1,35 @@
 import contextlib
-import copy
 import os
+import tempfile
 from typing import Any, Generator
+import unittest
 
 import readenv
 
 
 @contextlib.contextmanager
 def load(envfile: str = "tests/test.env") -> Generator[Any, Any, Any]:
-    environ = copy.deepcopy(os.environ)
-    readenv.load(envfile)
-    try:
+    with readenv.environ.transaction():
+        readenv.load(envfile)
         yield
-    finally:
-        os.environ.clear()
-        os.environ.update(environ)
+
+
+class TempDirTestCase(unittest.TestCase):
+    """A test case with a temporary directory, removed after each test, to write env files into"""
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, filename: str, content: str) -> str:
+        """Write content to filename, relative to the temporary directory, and return its path"""
+        path = os.path.join(self.tmpdir.name, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def chdir(self, dirname: str = "") -> None:
+        """Change the working directory to dirname, relative to the temporary directory, until the test ends"""
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(os.path.join(self.tmpdir.name, dirname))